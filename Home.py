@@ -194,16 +194,25 @@ DEMO_MODE = True  # Default to demo
 # Check for Streamlit secrets or credentials file
 try:
     if hasattr(st, 'secrets') and 'SPREADSHEET_ID' in st.secrets:
-        from google_sheets import get_all_jobs, get_all_customers, get_job_cost_totals, initialize_sheets
+        from google_sheets import (
+            get_all_jobs, get_all_customers, get_all_job_cost_totals, initialize_sheets, rebuild_job_totals,
+            split_weekly_costs_by_year, prefetch
+        )
         DEMO_MODE = False
     elif os.path.exists(os.path.join(os.path.dirname(__file__), 'credentials.json')):
-        from google_sheets import get_all_jobs, get_all_customers, get_job_cost_totals, initialize_sheets
+        from google_sheets import (
+            get_all_jobs, get_all_customers, get_all_job_cost_totals, initialize_sheets, rebuild_job_totals,
+            split_weekly_costs_by_year, prefetch
+        )
         DEMO_MODE = False
 except:
     pass
 
 if DEMO_MODE:
-    from demo_data import get_all_jobs, get_all_customers, get_job_cost_totals, initialize_sheets
+    from demo_data import (
+        get_all_jobs, get_all_customers, get_all_job_cost_totals, initialize_sheets, rebuild_job_totals,
+        split_weekly_costs_by_year, prefetch
+    )
 from utils import format_currency, get_status_color
 
 # Elite Wall Systems Brand Colors
@@ -462,6 +471,7 @@ with st.sidebar:
     st.page_link("pages/4_Customers.py", label="👥 Customers", icon=None)
     st.page_link("pages/5_Vendors.py", label="🏪 Vendors", icon=None)
     st.page_link("pages/6_Reports.py", label="📈 Reports", icon=None)
+    st.page_link("pages/7_Import.py", label="📥 Import", icon=None)
     
     st.markdown("---")
     st.caption("v1.0 | Job Costing System")
@@ -472,6 +482,16 @@ with st.sidebar:
                 initialize_sheets()
                 st.success("Sheets initialized!")
                 st.rerun()
+        if st.button("🧮 Rebuild Job Totals"):
+            with st.spinner("Recalculating job totals from weekly costs..."):
+                rebuild_job_totals()
+                st.success("Job totals rebuilt!")
+                st.rerun()
+        if st.button("📅 Split Weekly Costs by Year"):
+            with st.spinner("Moving weekly costs into yearly tabs..."):
+                moved = split_weekly_costs_by_year()
+                st.success(f"Moved {moved} weekly cost rows into yearly tabs!")
+                st.rerun()
 
 # Main content - Brand Header
 st.markdown(f"""
@@ -493,8 +513,11 @@ st.markdown('<p class="sub-header">Job Costing Dashboard</p>', unsafe_allow_html
 
 # Load data
 try:
+    # Every tab the home page uses, downloaded together in one request
+    prefetch("Jobs", "Customers", "JobTotals")
     jobs = get_all_jobs()
     customers = get_all_customers()
+    cost_totals = get_all_job_cost_totals()
 except Exception as e:
     st.error(f"⚠️ Error loading data: {e}")
     st.stop()
@@ -508,7 +531,7 @@ total_approved_cos = sum(float(j.get("approved_change_orders", 0) or 0) for j in
 total_costs = 0
 over_budget_jobs = 0
 for job in active_jobs:
-    totals = get_job_cost_totals(job["id"])
+    totals = cost_totals[str(job["id"])]
     job_cost = totals.get("total", 0)
     total_costs += job_cost
     
@@ -564,7 +587,7 @@ if active_jobs:
     job_data = []
     for job in active_jobs:
         customer_name = job.get("customers", {}).get("name", "N/A") if job.get("customers") else "N/A"
-        totals = get_job_cost_totals(job["id"])
+        totals = cost_totals[str(job["id"])]
         total_revenue = float(job.get("contract_amount", 0) or 0) + float(job.get("approved_change_orders", 0) or 0)
         total_budget = sum([
             float(job.get("budget_insurance", 0) or 0),
@@ -15,13 +15,13 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 DEMO_MODE = True
 try:
     if hasattr(st, 'secrets') and 'SPREADSHEET_ID' in st.secrets:
-        from google_sheets import get_all_jobs, get_job_cost_totals, get_all_weekly_costs
+        from google_sheets import get_jobs_df, get_job_cost_totals_df, prefetch
         DEMO_MODE = False
 except:
     pass
 
 if DEMO_MODE:
-    from demo_data import get_all_jobs, get_job_cost_totals, get_all_weekly_costs
+    from demo_data import get_jobs_df, get_job_cost_totals_df, prefetch
 from utils import format_currency
 from brand_styles import get_page_styling, get_sidebar_logo, BRAND_GREEN, BRAND_GREEN_DARK, BRAND_GRAY
 
@@ -40,46 +40,37 @@ st.markdown('<p class="page-subtitle">Visual overview of all jobs and costs</p>'
 
 # Load data
 try:
-    jobs = get_all_jobs()
-    weekly_costs = get_all_weekly_costs()
+    # Every tab the dashboard uses, downloaded together in one request
+    prefetch("Jobs", "Customers", "JobTotals")
+    jobs_df = get_jobs_df()
+    totals_df = get_job_cost_totals_df()
 except Exception as e:
     st.error(f"Error loading data: {e}")
     st.stop()
 
-if not jobs:
+if jobs_df.empty:
     st.info("No jobs found. Create your first job to see the dashboard.")
     st.stop()
 
 # Process job data
-job_metrics = []
-for job in jobs:
-    totals = get_job_cost_totals(job["id"])
-    total_budget = sum([
-        float(job.get("budget_insurance", 0) or 0),
-        float(job.get("budget_labor", 0) or 0),
-        float(job.get("budget_stamps", 0) or 0),
-        float(job.get("budget_material", 0) or 0),
-        float(job.get("budget_subs_bond", 0) or 0),
-        float(job.get("budget_equipment", 0) or 0),
-    ])
-    total_revenue = float(job.get("contract_amount", 0) or 0) + float(job.get("approved_change_orders", 0) or 0)
-    total_cost = totals.get("total", 0)
-    
-    job_metrics.append({
-        "job_number": job.get("job_number"),
-        "job_name": job.get("job_name"),
-        "status": job.get("status"),
-        "customer": job.get("customers", {}).get("name", "N/A") if job.get("customers") else "N/A",
-        "contract": float(job.get("contract_amount", 0) or 0),
-        "revenue": total_revenue,
-        "budget": total_budget,
-        "cost": total_cost,
-        "profit": total_revenue - total_cost,
-        "profit_margin": ((total_revenue - total_cost) / total_revenue * 100) if total_revenue > 0 else 0,
-        "budget_used": (total_cost / total_budget * 100) if total_budget > 0 else 0
-    })
-
-df_jobs = pd.DataFrame(job_metrics)
+total_budget = jobs_df[["budget_insurance", "budget_labor", "budget_stamps",
+                        "budget_material", "budget_subs_bond", "budget_equipment"]].sum(axis=1)
+total_revenue = jobs_df["contract_amount"] + jobs_df["approved_change_orders"]
+total_cost = jobs_df["id"].map(totals_df["total"]).fillna(0)
+
+df_jobs = pd.DataFrame({
+    "job_number": jobs_df["job_number"].astype(str),
+    "job_name": jobs_df["job_name"].astype(str),
+    "status": jobs_df["status"],
+    "customer": jobs_df["customer_name"].fillna("N/A"),
+    "contract": jobs_df["contract_amount"],
+    "revenue": total_revenue,
+    "budget": total_budget,
+    "cost": total_cost,
+    "profit": total_revenue - total_cost,
+    "profit_margin": ((total_revenue - total_cost) / total_revenue * 100).where(total_revenue > 0, 0),
+    "budget_used": (total_cost / total_budget * 100).where(total_budget > 0, 0)
+})
 
 # Summary Metrics
 st.markdown("### Summary")
@@ -16,7 +16,7 @@ try:
     if hasattr(st, 'secrets') and 'SPREADSHEET_ID' in st.secrets:
         from google_sheets import (
             get_all_jobs, get_all_customers, get_job_by_id,
-            create_job, update_job, delete_job, get_job_cost_totals
+            create_job, update_job, delete_job, get_all_job_cost_totals, ConflictError
         )
         DEMO_MODE = False
 except:
@@ -25,9 +25,9 @@ except:
 if DEMO_MODE:
     from demo_data import (
         get_all_jobs, get_all_customers, get_job_by_id,
-        create_job, update_job, delete_job, get_job_cost_totals
+        create_job, update_job, delete_job, get_all_job_cost_totals, ConflictError
     )
-from utils import format_currency, show_success_message, show_error_message
+from utils import format_currency, show_success_message, show_error_message, shown_version, keep_version
 from brand_styles import get_page_styling, get_sidebar_logo
 
 st.set_page_config(page_title="Jobs | Elite Wall Systems", page_icon="🏢", layout="wide")
@@ -50,6 +50,7 @@ if "edit_job_id" not in st.session_state:
 try:
     jobs = get_all_jobs()
     customers = get_all_customers()
+    cost_totals = get_all_job_cost_totals()
 except Exception as e:
     st.error(f"Error: {e}")
     st.stop()
@@ -81,7 +82,7 @@ with tab1:
     if filtered_jobs:
         for job in filtered_jobs:
             customer_name = job.get("customers", {}).get("name", "N/A") if job.get("customers") else "N/A"
-            totals = get_job_cost_totals(job["id"])
+            totals = cost_totals[str(job["id"])]
             total_revenue = float(job.get("contract_amount", 0) or 0) + float(job.get("approved_change_orders", 0) or 0)
             total_cost = totals.get("total", 0)
             
@@ -120,6 +121,7 @@ with tab1:
                 with col1:
                     if st.button("✏️ Edit", key=f"edit_{job['id']}"):
                         st.session_state.edit_job_id = job["id"]
+                        st.session_state.pop("edit_job_version", None)
                         st.rerun()
                 with col2:
                     if st.button("💰 Enter Costs", key=f"costs_{job['id']}"):
@@ -218,6 +220,7 @@ if st.session_state.edit_job_id:
     if job:
         st.markdown("---")
         st.markdown(f"### ✏️ Edit Job: {job.get('job_number')} - {job.get('job_name')}")
+        version = shown_version("edit_job", job["id"], job.get("updated_at"))
         
         with st.form("edit_job_form"):
             col1, col2 = st.columns(2)
@@ -279,10 +282,14 @@ if st.session_state.edit_job_id:
                     }
                     
                     try:
-                        update_job(st.session_state.edit_job_id, update_data)
+                        update_job(st.session_state.edit_job_id, update_data, expected_version=version)
                         show_success_message("Job updated!")
                         st.session_state.edit_job_id = None
                         st.rerun()
+                    except ConflictError as e:
+                        keep_version("edit_job", job["id"], e.current_version)
+                        show_error_message("Someone else saved this job while you were editing. "
+                                           "Save again to overwrite their changes, or cancel to see them.")
                     except Exception as e:
                         show_error_message(f"Error: {e}")
             
@@ -16,7 +16,8 @@ try:
     if hasattr(st, 'secrets') and 'SPREADSHEET_ID' in st.secrets:
         from google_sheets import (
             get_all_jobs, get_active_jobs, get_job_by_id, get_job_cost_totals,
-            get_weekly_costs_by_job, get_weekly_cost_entry, upsert_weekly_cost
+            get_weekly_costs_between, get_weekly_cost_entry, upsert_weekly_cost,
+            upsert_weekly_costs, ConflictError
         )
         DEMO_MODE = False
 except:
@@ -25,11 +26,13 @@ except:
 if DEMO_MODE:
     from demo_data import (
         get_all_jobs, get_active_jobs, get_job_by_id, get_job_cost_totals,
-        get_weekly_costs_by_job, get_weekly_cost_entry, upsert_weekly_cost
+        get_weekly_costs_between, get_weekly_cost_entry, upsert_weekly_cost,
+        upsert_weekly_costs, ConflictError
     )
 from utils import (
     format_currency, get_week_ending_date, get_last_n_week_endings,
-    show_success_message, show_error_message, get_variance_indicator
+    show_success_message, show_error_message, get_variance_indicator,
+    shown_version, keep_version
 )
 from brand_styles import get_page_styling, get_sidebar_logo
 
@@ -61,6 +64,84 @@ if not all_jobs:
     st.stop()
 
 st.markdown("---")
+entry_mode = st.radio("Entry Mode", ["Single Job", "All Active Jobs"], horizontal=True)
+
+if entry_mode == "All Active Jobs":
+    week_options = get_last_n_week_endings(12)
+    selected_week = st.selectbox("Week Ending", week_options, format_func=lambda x: x.strftime("%m/%d/%Y (%A)"))
+    
+    if not active_jobs:
+        st.info("No active jobs.")
+        st.stop()
+    
+    # Every active job's entry for the week, from one read
+    week_entries = {str(c["job_id"]): c for c in get_weekly_costs_between(selected_week, selected_week)}
+    grid_jobs = sorted(active_jobs, key=lambda j: str(j.get("job_number", "")))
+    grid_columns = {
+        "insurance_actual": "Insurance", "labor_actual": "Labor", "stamps_actual": "Stamps",
+        "material_actual": "Materials", "subs_bond_actual": "Subs/Bond", "equipment_actual": "Equipment"
+    }
+    
+    grid_rows = []
+    for j in grid_jobs:
+        entry = week_entries.get(str(j["id"]), {})
+        row = {"job": f"{j['job_number']} - {j['job_name']}"}
+        for col in grid_columns:
+            row[col] = float(entry.get(col, 0) or 0)
+        row["man_days_actual"] = int(entry.get("man_days_actual", 0) or 0)
+        row["notes"] = entry.get("notes", "") or ""
+        grid_rows.append(row)
+    grid_df = pd.DataFrame(grid_rows)
+    
+    # Job ids in grid order, with the version of each job's entry shown
+    versions = {str(j["id"]): week_entries.get(str(j["id"]), {}).get("updated_at", "") or "" for j in grid_jobs}
+    shown = shown_version("cost_grid", str(selected_week), versions)
+    
+    st.markdown(f"### Costs for Week Ending {selected_week.strftime('%m/%d/%Y')}")
+    column_config = {"job": st.column_config.TextColumn("Job", disabled=True)}
+    for col, label in grid_columns.items():
+        column_config[col] = st.column_config.NumberColumn(label, min_value=0.0, step=100.0, format="$%.2f")
+    column_config["man_days_actual"] = st.column_config.NumberColumn("Man Days", min_value=0, step=1)
+    column_config["notes"] = st.column_config.TextColumn("Notes")
+    editor_key = f"cost_grid_{selected_week}"
+    
+    with st.form("cost_grid_form"):
+        edited_df = st.data_editor(grid_df, key=editor_key, column_config=column_config,
+                                   hide_index=True, use_container_width=True)
+        week_total = edited_df[list(grid_columns)].sum().sum()
+        st.markdown(f"### Week Total: {format_currency(week_total)}")
+        submitted = st.form_submit_button("💾 Save All Changes", type="primary", use_container_width=True)
+    
+    if submitted:
+        # Only the cells that were edited, by position in the grid as shown
+        edited_rows = st.session_state.get(editor_key, {}).get("edited_rows", {})
+        shown_ids = list(shown)
+        entries = []
+        for position, cells in edited_rows.items():
+            job_id = shown_ids[int(position)]
+            # A cleared cell is a zero (or no notes)
+            cells = {col: (value or "") if col == "notes" else (value or 0) for col, value in cells.items()}
+            entries.append({"job_id": job_id, "week_ending": str(selected_week), **cells})
+        
+        if not entries:
+            st.info("No changes to save.")
+        else:
+            expected = {(e["job_id"], str(selected_week)): shown[e["job_id"]] for e in entries}
+            try:
+                upsert_weekly_costs(entries, expected_versions=expected)
+                # Start over from what was just saved
+                st.session_state.pop(editor_key, None)
+                st.session_state.pop("cost_grid_version", None)
+                show_success_message(f"Saved {len(entries)} jobs for week ending {selected_week.strftime('%m/%d/%Y')}!")
+                st.rerun()
+            except ConflictError:
+                keep_version("cost_grid", str(selected_week), versions)
+                show_error_message("Someone else saved some of these jobs for this week while you were entering them. "
+                                   "Save again to overwrite their entries, or reload the page to see them.")
+            except Exception as e:
+                show_error_message(f"Error: {e}")
+    st.stop()
+
 col1, col2 = st.columns(2)
 
 with col1:
@@ -81,6 +162,8 @@ if selected_job_id:
     job = get_job_by_id(selected_job_id)
     totals = get_job_cost_totals(selected_job_id)
     existing_entry = get_weekly_cost_entry(selected_job_id, str(selected_week))
+    entry_key = (selected_job_id, str(selected_week))
+    version = shown_version("cost_entry", entry_key, existing_entry.get("updated_at") if existing_entry else "")
     
     if job:
         st.markdown("---")
@@ -180,17 +263,22 @@ if selected_job_id:
                 }
                 
                 try:
-                    upsert_weekly_cost(cost_data)
+                    saved = upsert_weekly_cost(cost_data, expected_version=version)
+                    keep_version("cost_entry", entry_key, saved.get("updated_at"))
                     show_success_message(f"Week ending {selected_week.strftime('%m/%d/%Y')} saved!")
                     st.rerun()
+                except ConflictError as e:
+                    keep_version("cost_entry", entry_key, e.current_version)
+                    show_error_message("Someone else saved this week while you were entering it. "
+                                       "Save again to overwrite their entry, or reload the page to see it.")
                 except Exception as e:
                     show_error_message(f"Error: {e}")
         
         # Cost History
         st.markdown("---")
-        st.markdown("### 📊 Cost History for This Job")
+        st.markdown(f"### 📊 Cost History for This Job (Last {len(week_options)} Weeks)")
         
-        history = get_weekly_costs_by_job(selected_job_id)
+        history = get_weekly_costs_between(min(week_options), max(week_options), selected_job_id)
         if history:
             history_df = pd.DataFrame(history)
             display_cols = ["week_ending", "insurance_actual", "labor_actual", "stamps_actual", 
@@ -215,7 +303,7 @@ if selected_job_id:
             
             st.dataframe(display_df, use_container_width=True, hide_index=True)
         else:
-            st.info("No cost entries yet for this job.")
+            st.info(f"No cost entries for this job in the last {len(week_options)} weeks.")
         
         # Budget vs Actual Summary
         st.markdown("---")
@@ -15,7 +15,7 @@ try:
     if hasattr(st, 'secrets') and 'SPREADSHEET_ID' in st.secrets:
         from google_sheets import (
             get_all_customers, get_customer_by_id,
-            create_customer, update_customer, delete_customer
+            create_customer, update_customer, delete_customer, ConflictError
         )
         DEMO_MODE = False
 except:
@@ -24,9 +24,9 @@ except:
 if DEMO_MODE:
     from demo_data import (
         get_all_customers, get_customer_by_id,
-        create_customer, update_customer, delete_customer
+        create_customer, update_customer, delete_customer, ConflictError
     )
-from utils import show_success_message, show_error_message
+from utils import show_success_message, show_error_message, shown_version, keep_version
 from brand_styles import get_page_styling, get_sidebar_logo
 
 st.set_page_config(page_title="Customers | Elite Wall Systems", page_icon="🏢", layout="wide")
@@ -86,6 +86,7 @@ with tab1:
                 with col1:
                     if st.button("✏️ Edit", key=f"edit_cust_{customer['id']}"):
                         st.session_state.edit_customer_id = customer["id"]
+                        st.session_state.pop("edit_customer_version", None)
                         st.rerun()
                 with col2:
                     if st.button("🗑️ Delete", key=f"del_cust_{customer['id']}", type="secondary"):
@@ -143,6 +144,7 @@ if st.session_state.edit_customer_id:
     if customer:
         st.markdown("---")
         st.markdown(f"### ✏️ Edit Customer: {customer.get('name')}")
+        version = shown_version("edit_customer", customer["id"], customer.get("updated_at"))
         
         with st.form("edit_customer_form"):
             edit_name = st.text_input("Company Name", value=customer.get("name", ""))
@@ -161,10 +163,14 @@ if st.session_state.edit_customer_id:
                     data = {"name": edit_name, "contact_name": edit_contact, "phone": edit_phone,
                            "email": edit_email, "address": edit_address, "notes": edit_notes}
                     try:
-                        update_customer(st.session_state.edit_customer_id, data)
+                        update_customer(st.session_state.edit_customer_id, data, expected_version=version)
                         show_success_message("Customer updated!")
                         st.session_state.edit_customer_id = None
                         st.rerun()
+                    except ConflictError as e:
+                        keep_version("edit_customer", customer["id"], e.current_version)
+                        show_error_message("Someone else saved this customer while you were editing. "
+                                           "Save again to overwrite their changes, or cancel to see them.")
                     except Exception as e:
                         show_error_message(f"Error: {e}")
             with col2:
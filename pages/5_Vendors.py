@@ -15,7 +15,7 @@ try:
     if hasattr(st, 'secrets') and 'SPREADSHEET_ID' in st.secrets:
         from google_sheets import (
             get_all_vendors, get_vendor_by_id,
-            create_vendor, update_vendor, delete_vendor
+            create_vendor, update_vendor, delete_vendor, ConflictError
         )
         DEMO_MODE = False
 except:
@@ -24,9 +24,9 @@ except:
 if DEMO_MODE:
     from demo_data import (
         get_all_vendors, get_vendor_by_id,
-        create_vendor, update_vendor, delete_vendor
+        create_vendor, update_vendor, delete_vendor, ConflictError
     )
-from utils import show_success_message, show_error_message
+from utils import show_success_message, show_error_message, shown_version, keep_version
 from brand_styles import get_page_styling, get_sidebar_logo
 
 st.set_page_config(page_title="Vendors | Elite Wall Systems", page_icon="🏢", layout="wide")
@@ -99,6 +99,7 @@ with tab1:
                 with col1:
                     if st.button("✏️ Edit", key=f"edit_vend_{vendor['id']}"):
                         st.session_state.edit_vendor_id = vendor["id"]
+                        st.session_state.pop("edit_vendor_version", None)
                         st.rerun()
                 with col2:
                     if st.button("🗑️ Delete", key=f"del_vend_{vendor['id']}", type="secondary"):
@@ -156,6 +157,7 @@ if st.session_state.edit_vendor_id:
     if vendor:
         st.markdown("---")
         st.markdown(f"### ✏️ Edit Vendor: {vendor.get('name')}")
+        version = shown_version("edit_vendor", vendor["id"], vendor.get("updated_at"))
         
         with st.form("edit_vendor_form"):
             edit_name = st.text_input("Company Name", value=vendor.get("name", ""))
@@ -178,10 +180,14 @@ if st.session_state.edit_vendor_id:
                     data = {"name": edit_name, "vendor_type": edit_type, "contact_name": edit_contact,
                            "phone": edit_phone, "email": edit_email, "address": edit_address, "notes": edit_notes}
                     try:
-                        update_vendor(st.session_state.edit_vendor_id, data)
+                        update_vendor(st.session_state.edit_vendor_id, data, expected_version=version)
                         show_success_message("Vendor updated!")
                         st.session_state.edit_vendor_id = None
                         st.rerun()
+                    except ConflictError as e:
+                        keep_version("edit_vendor", vendor["id"], e.current_version)
+                        show_error_message("Someone else saved this vendor while you were editing. "
+                                           "Save again to overwrite their changes, or cancel to see them.")
                     except Exception as e:
                         show_error_message(f"Error: {e}")
             with col2:
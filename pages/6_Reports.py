@@ -16,13 +16,17 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 DEMO_MODE = True
 try:
     if hasattr(st, 'secrets') and 'SPREADSHEET_ID' in st.secrets:
-        from google_sheets import get_all_jobs, get_all_customers, get_job_cost_totals, get_all_weekly_costs
+        from google_sheets import (
+            get_jobs_df, get_customers_df, get_job_cost_totals_df, get_weekly_costs_df, prefetch
+        )
         DEMO_MODE = False
 except:
     pass
 
 if DEMO_MODE:
-    from demo_data import get_all_jobs, get_all_customers, get_job_cost_totals, get_all_weekly_costs
+    from demo_data import (
+        get_jobs_df, get_customers_df, get_job_cost_totals_df, get_weekly_costs_df, prefetch
+    )
 from utils import format_currency, export_to_excel
 from brand_styles import get_page_styling, get_sidebar_logo, BRAND_GREEN, BRAND_GREEN_DARK, BRAND_GRAY
 
@@ -40,17 +44,29 @@ st.markdown('<div class="section-header">📈 Reports</div>', unsafe_allow_html=
 st.markdown('<p class="page-subtitle">Generate and export job costing reports</p>', unsafe_allow_html=True)
 
 try:
-    jobs = get_all_jobs()
-    customers = get_all_customers()
-    all_weekly_costs = get_all_weekly_costs()
+    # Every tab the reports use, downloaded together in one request
+    prefetch("Jobs", "Customers", "WeeklyCosts", "JobTotals")
+    jobs_df = get_jobs_df()
+    customers_df = get_customers_df()
+    weekly_costs_df = get_weekly_costs_df()
+    totals_df = get_job_cost_totals_df()
 except Exception as e:
     st.error(f"Error: {e}")
     st.stop()
 
-if not jobs:
+if jobs_df.empty:
     st.info("No jobs found. Create jobs to generate reports.")
     st.stop()
 
+# One row per job with its cost totals joined in
+cost_columns = ["insurance", "labor", "stamps", "material", "subs_bond", "equipment", "man_days", "total"]
+job_costs = jobs_df.join(totals_df[cost_columns], on="id")
+job_costs[cost_columns] = job_costs[cost_columns].fillna(0)
+job_costs["label"] = job_costs["job_number"].astype(str) + " - " + job_costs["job_name"].astype(str)
+job_costs["revenue"] = job_costs["contract_amount"] + job_costs["approved_change_orders"]
+job_costs["profit"] = job_costs["revenue"] - job_costs["total"]
+job_costs["margin"] = (job_costs["profit"] / job_costs["revenue"] * 100).where(job_costs["revenue"] > 0, 0)
+
 report_type = st.selectbox("Select Report", [
     "Job Cost Summary",
     "Job Profitability Analysis", 
@@ -65,40 +81,30 @@ st.markdown("---")
 if report_type == "Job Cost Summary":
     st.markdown("### Job Cost Summary Report")
     
-    job_options = ["All Jobs"] + [f"{j['job_number']} - {j['job_name']}" for j in jobs]
+    job_options = ["All Jobs"] + job_costs["label"].tolist()
     selected = st.selectbox("Select Job", job_options)
     
-    report_jobs = jobs if selected == "All Jobs" else [j for j in jobs if f"{j['job_number']} - {j['job_name']}" == selected]
-    
-    report_data = []
-    for job in report_jobs:
-        totals = get_job_cost_totals(job["id"])
-        customer = job.get("customers", {}).get("name", "N/A") if job.get("customers") else "N/A"
-        total_revenue = float(job.get("contract_amount", 0) or 0) + float(job.get("approved_change_orders", 0) or 0)
-        total_cost = totals.get("total", 0)
-        profit = total_revenue - total_cost
-        
-        report_data.append({
-            "Job #": job.get("job_number"),
-            "Job Name": job.get("job_name"),
-            "Customer": customer,
-            "Status": str(job.get("status", "")).title(),
-            "Contract": float(job.get("contract_amount", 0) or 0),
-            "Change Orders": float(job.get("approved_change_orders", 0) or 0),
-            "Total Revenue": total_revenue,
-            "Insurance": totals.get("insurance", 0),
-            "Labor": totals.get("labor", 0),
-            "Stamps": totals.get("stamps", 0),
-            "Materials": totals.get("material", 0),
-            "Subs/Bond": totals.get("subs_bond", 0),
-            "Equipment": totals.get("equipment", 0),
-            "Total Cost": total_cost,
-            "Profit": profit,
-            "Margin %": (profit / total_revenue * 100) if total_revenue > 0 else 0,
-            "Man Days": totals.get("man_days", 0)
-        })
+    report_jobs = job_costs if selected == "All Jobs" else job_costs[job_costs["label"] == selected]
     
-    df = pd.DataFrame(report_data)
+    df = pd.DataFrame({
+        "Job #": report_jobs["job_number"],
+        "Job Name": report_jobs["job_name"],
+        "Customer": report_jobs["customer_name"].fillna("N/A"),
+        "Status": report_jobs["status"].astype(str).str.title(),
+        "Contract": report_jobs["contract_amount"],
+        "Change Orders": report_jobs["approved_change_orders"],
+        "Total Revenue": report_jobs["revenue"],
+        "Insurance": report_jobs["insurance"],
+        "Labor": report_jobs["labor"],
+        "Stamps": report_jobs["stamps"],
+        "Materials": report_jobs["material"],
+        "Subs/Bond": report_jobs["subs_bond"],
+        "Equipment": report_jobs["equipment"],
+        "Total Cost": report_jobs["total"],
+        "Profit": report_jobs["profit"],
+        "Margin %": report_jobs["margin"],
+        "Man Days": report_jobs["man_days"].astype(int)
+    })
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -128,22 +134,12 @@ if report_type == "Job Cost Summary":
 elif report_type == "Job Profitability Analysis":
     st.markdown("### Job Profitability Analysis")
     
-    profit_data = []
-    for job in jobs:
-        totals = get_job_cost_totals(job["id"])
-        total_revenue = float(job.get("contract_amount", 0) or 0) + float(job.get("approved_change_orders", 0) or 0)
-        total_cost = totals.get("total", 0)
-        profit = total_revenue - total_cost
-        margin = (profit / total_revenue * 100) if total_revenue > 0 else 0
-        
-        profit_data.append({
-            "job": f"{job['job_number']} - {str(job['job_name'])[:15]}",
-            "revenue": total_revenue, "cost": total_cost,
-            "profit": profit, "margin": margin,
-            "status": job.get("status", "")
-        })
-    
-    profit_df = pd.DataFrame(profit_data)
+    profit_df = pd.DataFrame({
+        "job": job_costs["job_number"].astype(str) + " - " + job_costs["job_name"].astype(str).str[:15],
+        "revenue": job_costs["revenue"], "cost": job_costs["total"],
+        "profit": job_costs["profit"], "margin": job_costs["margin"],
+        "status": job_costs["status"]
+    })
     
     status_filter = st.multiselect("Filter by Status", ["active", "completed", "estimate", "closed"], default=["active", "completed"])
     filtered_df = profit_df[profit_df["status"].isin(status_filter)] if status_filter else profit_df
@@ -164,29 +160,16 @@ elif report_type == "Job Profitability Analysis":
 elif report_type == "Budget vs Actual Comparison":
     st.markdown("### Budget vs Actual Comparison")
     
-    job_options = {j["id"]: f"{j['job_number']} - {j['job_name']}" for j in jobs}
+    job_options = dict(zip(job_costs["id"], job_costs["label"]))
     selected_job_id = st.selectbox("Select Job", list(job_options.keys()), format_func=lambda x: job_options[x])
     
-    job = next(j for j in jobs if j["id"] == selected_job_id)
-    totals = get_job_cost_totals(selected_job_id)
+    job = job_costs[job_costs["id"] == selected_job_id].iloc[0]
     
     categories = ["Insurance", "Labor", "Stamps", "Materials", "Subs/Bond", "Equipment"]
-    budget_values = [
-        float(job.get("budget_insurance", 0) or 0),
-        float(job.get("budget_labor", 0) or 0),
-        float(job.get("budget_stamps", 0) or 0),
-        float(job.get("budget_material", 0) or 0),
-        float(job.get("budget_subs_bond", 0) or 0),
-        float(job.get("budget_equipment", 0) or 0)
-    ]
-    actual_values = [
-        totals.get("insurance", 0),
-        totals.get("labor", 0),
-        totals.get("stamps", 0),
-        totals.get("material", 0),
-        totals.get("subs_bond", 0),
-        totals.get("equipment", 0)
-    ]
+    budget_values = job[["budget_insurance", "budget_labor", "budget_stamps",
+                         "budget_material", "budget_subs_bond", "budget_equipment"]].astype(float).tolist()
+    actual_values = job[["insurance", "labor", "stamps",
+                         "material", "subs_bond", "equipment"]].astype(float).tolist()
     
     fig = go.Figure()
     fig.add_trace(go.Bar(name="Budget", x=categories, y=budget_values, marker_color=BRAND_GRAY))
@@ -211,23 +194,22 @@ elif report_type == "Budget vs Actual Comparison":
 elif report_type == "Customer Summary":
     st.markdown("### Customer Summary Report")
     
-    customer_data = []
-    for customer in customers:
-        customer_jobs = [j for j in jobs if str(j.get("customer_id", "")) == str(customer["id"])]
-        total_revenue = sum(float(j.get("contract_amount", 0) or 0) + float(j.get("approved_change_orders", 0) or 0) for j in customer_jobs)
-        total_cost = sum(get_job_cost_totals(j["id"]).get("total", 0) for j in customer_jobs)
-        
-        customer_data.append({
-            "Customer": customer.get("name"),
-            "Jobs": len(customer_jobs),
-            "Active Jobs": len([j for j in customer_jobs if j.get("status") == "active"]),
-            "Total Revenue": total_revenue,
-            "Total Cost": total_cost,
-            "Profit": total_revenue - total_cost,
-            "Margin %": ((total_revenue - total_cost) / total_revenue * 100) if total_revenue > 0 else 0
-        })
+    by_customer = job_costs.assign(active=job_costs["status"] == "active").groupby("customer_id").agg(
+        jobs=("id", "size"), active=("active", "sum"), revenue=("revenue", "sum"), cost=("total", "sum")
+    )
+    customer_ids = customers_df["id"].astype(str) if "id" in customers_df.columns else pd.Series(dtype=str)
+    summary = by_customer.reindex(customer_ids).fillna(0)
     
-    cust_df = pd.DataFrame(customer_data).sort_values("Total Revenue", ascending=False)
+    cust_df = pd.DataFrame({
+        "Customer": customers_df["name"].tolist() if "name" in customers_df.columns else [],
+        "Jobs": summary["jobs"].astype(int).tolist(),
+        "Active Jobs": summary["active"].astype(int).tolist(),
+        "Total Revenue": summary["revenue"].tolist(),
+        "Total Cost": summary["cost"].tolist(),
+        "Profit": (summary["revenue"] - summary["cost"]).tolist(),
+        "Margin %": ((summary["revenue"] - summary["cost"]) / summary["revenue"] * 100)
+                    .where(summary["revenue"] > 0, 0).tolist()
+    }).sort_values("Total Revenue", ascending=False)
     
     display_df = cust_df.copy()
     for col in ["Total Revenue", "Total Cost", "Profit"]:
@@ -249,23 +231,18 @@ elif report_type == "Export All Data":
     
     with col1:
         st.markdown("#### Jobs Data")
-        jobs_df = pd.DataFrame(jobs)
-        if not jobs_df.empty and "customers" in jobs_df.columns:
-            jobs_df["customer_name"] = jobs_df["customers"].apply(lambda x: x.get("name", "") if isinstance(x, dict) else "")
-            jobs_df = jobs_df.drop(columns=["customers"], errors="ignore")
         if not jobs_df.empty:
-            excel_jobs = export_to_excel(jobs_df)
+            excel_jobs = export_to_excel(jobs_df.assign(customer_name=jobs_df["customer_name"].fillna("")))
             st.download_button("📥 Download Jobs", data=excel_jobs,
                 file_name=f"jobs_export_{datetime.now().strftime('%Y%m%d')}.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
     
     with col2:
         st.markdown("#### Weekly Costs Data")
-        if all_weekly_costs:
-            costs_df = pd.DataFrame(all_weekly_costs)
-            if "jobs" in costs_df.columns:
-                costs_df["job_info"] = costs_df["jobs"].apply(lambda x: f"{x.get('job_number', '')} - {x.get('job_name', '')}" if isinstance(x, dict) else "")
-                costs_df = costs_df.drop(columns=["jobs"], errors="ignore")
+        if not weekly_costs_df.empty:
+            job_info = weekly_costs_df["job_number"].astype(str) + " - " + weekly_costs_df["job_name"].astype(str)
+            costs_df = weekly_costs_df.drop(columns=["job_number", "job_name"])
+            costs_df["job_info"] = job_info.where(weekly_costs_df["job_number"].notna(), "")
             excel_costs = export_to_excel(costs_df)
             st.download_button("📥 Download Weekly Costs", data=excel_costs,
                 file_name=f"weekly_costs_export_{datetime.now().strftime('%Y%m%d')}.xlsx",
@@ -276,9 +253,8 @@ elif report_type == "Export All Data":
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("#### Customers Data")
-        if customers:
-            cust_df = pd.DataFrame(customers)
-            excel_cust = export_to_excel(cust_df)
+        if not customers_df.empty:
+            excel_cust = export_to_excel(customers_df)
             st.download_button("📥 Download Customers", data=excel_cust,
                 file_name=f"customers_export_{datetime.now().strftime('%Y%m%d')}.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
\ No newline at end of file
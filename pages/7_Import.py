@@ -0,0 +1,106 @@
+"""
+Bulk Import Page - Load jobs or weekly costs from CSV/Excel exports
+"""
+import streamlit as st
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# Check if Google Sheets is configured
+DEMO_MODE = True
+try:
+    if hasattr(st, 'secrets') and 'SPREADSHEET_ID' in st.secrets:
+        from google_sheets import import_weekly_costs, import_jobs
+        DEMO_MODE = False
+except:
+    pass
+
+if DEMO_MODE:
+    from demo_data import import_weekly_costs, import_jobs
+from bulk_import import read_chunks, template_csv, COST_IMPORT_COLUMNS, JOB_IMPORT_COLUMNS, JOB_STATUSES
+from utils import show_success_message, show_error_message, show_warning_message
+from brand_styles import get_page_styling, get_sidebar_logo
+
+st.set_page_config(page_title="Import | Elite Wall Systems", page_icon="🏢", layout="wide")
+
+# Apply branding
+st.markdown(get_page_styling(), unsafe_allow_html=True)
+
+# Sidebar
+with st.sidebar:
+    st.markdown(get_sidebar_logo(), unsafe_allow_html=True)
+    st.markdown("---")
+
+st.markdown('<div class="section-header">📥 Import</div>', unsafe_allow_html=True)
+st.markdown('<p class="page-subtitle">Load jobs or weekly costs from accounting exports (CSV or Excel)</p>',
+            unsafe_allow_html=True)
+
+IMPORTS = {
+    "Weekly Costs": {
+        "columns": COST_IMPORT_COLUMNS,
+        "run": import_weekly_costs,
+        "help": "One row per job and week. Rows for a job and week that already has an entry "
+                "update it; blank cells keep the amounts already entered.",
+    },
+    "Jobs": {
+        "columns": JOB_IMPORT_COLUMNS,
+        "run": import_jobs,
+        "help": "One row per job, matched by job number. Existing jobs are updated (blank cells "
+                f"keep their values); new jobs need a job name. Status is one of {', '.join(JOB_STATUSES)} "
+                "(new jobs default to active) and customer_name must match a customer.",
+    },
+}
+
+st.markdown("---")
+col1, col2 = st.columns([2, 1])
+with col1:
+    kind = st.radio("What are you importing?", list(IMPORTS), horizontal=True)
+    st.caption(IMPORTS[kind]["help"])
+with col2:
+    st.download_button(
+        "📄 Download Template",
+        data=template_csv(IMPORTS[kind]["columns"]),
+        file_name=f"{kind.lower().replace(' ', '_')}_template.csv",
+        mime="text/csv",
+        use_container_width=True
+    )
+
+st.caption("Columns: " + ", ".join(IMPORTS[kind]["columns"]))
+
+uploaded = st.file_uploader("Choose a file", type=["csv", "xlsx"])
+
+if uploaded:
+    try:
+        preview = next(read_chunks(uploaded, uploaded.name, chunk_rows=10), pd.DataFrame())
+    except Exception as e:
+        show_error_message(f"Could not read {uploaded.name}: {e}")
+        st.stop()
+
+    st.markdown("### 👀 Preview")
+    st.dataframe(preview, use_container_width=True, hide_index=True)
+    unknown = [c for c in preview.columns if c not in IMPORTS[kind]["columns"] + ["job_id", "customer_id"]]
+    if unknown:
+        show_warning_message(f"These columns will be ignored: {', '.join(unknown)}")
+
+    if st.button(f"📥 Import {kind}", type="primary", use_container_width=True):
+        uploaded.seek(0)
+        try:
+            with st.spinner(f"Importing {kind.lower()}..."):
+                result = IMPORTS[kind]["run"](read_chunks(uploaded, uploaded.name))
+        except Exception as e:
+            show_error_message(f"Error: {e}")
+            st.stop()
+
+        show_success_message(f"{result['inserted']} added, {result['updated']} updated")
+        if result["errors"]:
+            show_warning_message(f"{len(result['errors'])} rows were skipped")
+            errors_df = pd.DataFrame(result["errors"]).rename(columns={"row": "Row", "error": "Problem"})
+            st.dataframe(errors_df, use_container_width=True, hide_index=True)
+            st.download_button(
+                "📥 Download Skipped Rows",
+                data=errors_df.to_csv(index=False),
+                file_name="skipped_rows.csv",
+                mime="text/csv"
+            )
@@ -0,0 +1,239 @@
+"""
+Bulk Import
+Reads CSV or Excel files a chunk of rows at a time and turns each chunk into
+typed Jobs or WeeklyCosts rows with whole-column operations, collecting a
+message for every bad row instead of stopping at the first one. Shared by the
+Google Sheets and demo backends, which decide how the rows are saved.
+"""
+import re
+from datetime import datetime
+import pandas as pd
+
+# Rows read and checked at a time
+CHUNK_ROWS = 2000
+
+COST_AMOUNT_COLUMNS = [
+    "insurance_actual", "labor_actual", "stamps_actual", "material_actual",
+    "subs_bond_actual", "equipment_actual", "man_days_actual"
+]
+JOB_AMOUNT_COLUMNS = [
+    "contract_amount", "pending_change_orders", "approved_change_orders",
+    "budget_insurance", "budget_labor", "budget_stamps", "budget_material",
+    "budget_subs_bond", "budget_equipment", "budget_man_days"
+]
+JOB_STATUSES = ["estimate", "active", "completed", "closed"]
+
+# Columns each import understands, for templates and the page's help text
+COST_IMPORT_COLUMNS = ["job_number", "week_ending"] + COST_AMOUNT_COLUMNS + ["notes"]
+JOB_IMPORT_COLUMNS = (["job_number", "job_name", "customer_name", "status", "start_date", "end_date"]
+                      + JOB_AMOUNT_COLUMNS + ["notes"])
+
+# Other headers accepted for a column (after lower-casing, punctuation -> _)
+COLUMN_ALIASES = {
+    "job": "job_number", "job_no": "job_number", "week": "week_ending",
+    "week_end": "week_ending", "customer": "customer_name", "gc": "customer_name",
+    "insurance": "insurance_actual", "labor": "labor_actual", "stamps": "stamps_actual",
+    "material": "material_actual", "materials": "material_actual",
+    "subs_bond": "subs_bond_actual", "equipment": "equipment_actual",
+    "man_days": "man_days_actual", "contract": "contract_amount"
+}
+
+
+def normalize_header(name):
+    """A file's column header as the column name it stands for"""
+    key = re.sub(r'[^a-z0-9]+', '_', str(name).strip().lower()).strip('_')
+    return COLUMN_ALIASES.get(key, key)
+
+
+def cell_text(value):
+    """An Excel cell as the text a CSV export of it would hold"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S' if value.time() else '%Y-%m-%d')
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def excel_chunks(file, chunk_rows):
+    """Rows of the first sheet of an .xlsx file as DataFrames of text, streamed"""
+    # Only needed for Excel files
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        headers = [cell_text(value) for value in next(rows, ())]
+        batch, positions = [], []
+        # Position 0 is the first row after the header, as in a CSV chunk
+        for position, row in enumerate(rows):
+            values = [cell_text(value) for value in row[:len(headers)]]
+            if not any(values):
+                continue
+            batch.append(values + [''] * (len(headers) - len(values)))
+            positions.append(position)
+            if len(batch) == chunk_rows:
+                yield pd.DataFrame(batch, columns=headers, index=positions)
+                batch, positions = [], []
+        if batch:
+            yield pd.DataFrame(batch, columns=headers, index=positions)
+    finally:
+        workbook.close()
+
+
+def read_chunks(file, file_name=None, chunk_rows=CHUNK_ROWS):
+    """
+    Stream a CSV or .xlsx file (a path or file object) as DataFrames of up
+    to chunk_rows rows. Every cell is stripped text, headers are normalized
+    and the index is the row's position after the header, so index + 2 is
+    its row number in the file.
+    """
+    name = str(file_name or getattr(file, 'name', file)).lower()
+    if name.endswith(('.xlsx', '.xlsm')):
+        chunks = excel_chunks(file, chunk_rows)
+    else:
+        chunks = pd.read_csv(file, dtype=str, keep_default_na=False, chunksize=chunk_rows,
+                             encoding='utf-8-sig')
+    for chunk in chunks:
+        chunk.columns = [normalize_header(column) for column in chunk.columns]
+        chunk = chunk.loc[:, ~chunk.columns.duplicated()].apply(lambda values: values.str.strip())
+        # Spreadsheet exports often end in rows of empty cells
+        yield chunk[(chunk != '').any(axis=1)]
+
+
+def parse_amounts(values):
+    """
+    Amount text as floats ($, commas and accounting (negatives) allowed),
+    blanks as NaN. Returns (amounts, mask of cells that aren't amounts).
+    """
+    text = values.str.replace(r'[$,\s]', '', regex=True).str.replace(r'^\((.*)\)$', r'-\1', regex=True)
+    amounts = pd.to_numeric(text, errors='coerce')
+    return amounts, amounts.isna() & (text != '')
+
+
+def parse_dates(values):
+    """Date text as YYYY-MM-DD (blanks NaN). Returns (dates, mask of cells that aren't dates)."""
+    dates = pd.to_datetime(values, errors='coerce', format='mixed')
+    return dates.dt.strftime('%Y-%m-%d'), dates.isna() & (values != '')
+
+
+def blank_to_na(values):
+    """Text with blank cells as NaN, so they leave stored values alone"""
+    return values.where(values != '')
+
+
+def flag(errors, mask, message):
+    """Record a message for the rows in mask that don't have one yet"""
+    errors[mask & (errors == '')] = message
+
+
+def split_errors(rows, errors):
+    """The rows without an error, and a {"row", "error"} dict for each one with"""
+    bad = errors != ''
+    problems = [{"row": position + 2, "error": message}
+                for position, message in errors[bad].items()]
+    return rows[~bad], problems
+
+
+def coerce_costs(chunk, jobs):
+    """
+    Typed WeeklyCosts rows of a file chunk: job_id (from a job_id or
+    job_number column, checked against jobs' id and job_number), week_ending
+    as YYYY-MM-DD, the file's amount columns as floats and its notes. Blank
+    cells are NaN. Returns (rows, errors).
+    """
+    errors = pd.Series('', index=chunk.index)
+    blank = pd.Series('', index=chunk.index)
+    ids = jobs['id'].astype(str) if 'id' in jobs.columns else pd.Series([], dtype=str)
+    numbers = jobs['job_number'].astype(str) if 'job_number' in jobs.columns else pd.Series([], dtype=str)
+
+    job_id = chunk.get('job_id', blank)
+    job_number = chunk.get('job_number', blank)
+    by_number = pd.Series(ids.values, index=numbers.values)
+    by_number = by_number[~by_number.index.duplicated()]
+    job_id = job_id.where(job_id != '', job_number.map(by_number)).fillna('')
+    flag(errors, (job_id == '') & (job_number == ''), "job_number is missing")
+    flag(errors, ~job_id.isin(ids), "unknown job")
+
+    week_ending, bad_dates = parse_dates(chunk.get('week_ending', blank))
+    flag(errors, bad_dates, "week_ending is not a date")
+    flag(errors, week_ending.isna(), "week_ending is missing")
+
+    rows = pd.DataFrame({'job_id': job_id, 'week_ending': week_ending}, index=chunk.index)
+    for column in COST_AMOUNT_COLUMNS:
+        if column in chunk.columns:
+            rows[column], bad = parse_amounts(chunk[column])
+            flag(errors, bad, f"{column} is not a number")
+    if 'notes' in chunk.columns:
+        rows['notes'] = blank_to_na(chunk['notes'])
+    return split_errors(rows, errors)
+
+
+def coerce_jobs(chunk, jobs, customers):
+    """
+    Typed Jobs rows of a file chunk, keyed by job_number: the customer from a
+    customer_name (matched to customers without regard to case) or
+    customer_id column, status, dates as YYYY-MM-DD and amounts as floats.
+    Rows for job numbers not in jobs need a job_name. Blank cells are NaN.
+    Returns (rows, errors).
+    """
+    errors = pd.Series('', index=chunk.index)
+    blank = pd.Series('', index=chunk.index)
+    known = jobs['job_number'].astype(str) if 'job_number' in jobs.columns else pd.Series([], dtype=str)
+
+    rows = pd.DataFrame({'job_number': chunk.get('job_number', blank)}, index=chunk.index)
+    flag(errors, rows['job_number'] == '', "job_number is missing")
+    if 'job_name' in chunk.columns:
+        rows['job_name'] = blank_to_na(chunk['job_name'])
+    flag(errors, ~rows['job_number'].isin(known) & (chunk.get('job_name', blank) == ''),
+         "job_name is missing for a new job")
+
+    ids = customers['id'].astype(str) if 'id' in customers.columns else pd.Series([], dtype=str)
+    if 'customer_name' in chunk.columns:
+        names = customers['name'].astype(str).str.strip().str.lower() if 'name' in customers.columns else ids
+        by_name = pd.Series(ids.values, index=names.values)
+        by_name = by_name[~by_name.index.duplicated()]
+        customer_name = chunk['customer_name']
+        rows['customer_id'] = blank_to_na(customer_name).str.lower().map(by_name)
+        flag(errors, rows['customer_id'].isna() & (customer_name != ''), "unknown customer")
+    elif 'customer_id' in chunk.columns:
+        rows['customer_id'] = blank_to_na(chunk['customer_id'])
+        flag(errors, rows['customer_id'].notna() & ~rows['customer_id'].isin(ids), "unknown customer")
+
+    if 'status' in chunk.columns:
+        rows['status'] = blank_to_na(chunk['status'].str.lower())
+        flag(errors, rows['status'].notna() & ~rows['status'].isin(JOB_STATUSES),
+             f"status must be one of {', '.join(JOB_STATUSES)}")
+    for column in ('start_date', 'end_date'):
+        if column in chunk.columns:
+            rows[column], bad = parse_dates(chunk[column])
+            flag(errors, bad, f"{column} is not a date")
+    for column in JOB_AMOUNT_COLUMNS:
+        if column in chunk.columns:
+            rows[column], bad = parse_amounts(chunk[column])
+            flag(errors, bad, f"{column} is not a number")
+    if 'notes' in chunk.columns:
+        rows['notes'] = blank_to_na(chunk['notes'])
+    return split_errors(rows, errors)
+
+
+def collect(chunks, coerce, key_columns, *lookups):
+    """
+    Run every chunk through coerce(chunk, *lookups) and stack the good rows,
+    the last one winning where the file repeats a key. Returns (rows, errors).
+    """
+    frames, errors = [], []
+    for chunk in chunks:
+        rows, chunk_errors = coerce(chunk, *lookups)
+        frames.append(rows)
+        errors.extend(chunk_errors)
+    if not frames:
+        return pd.DataFrame(columns=key_columns), errors
+    rows = pd.concat(frames)
+    return rows.drop_duplicates(key_columns, keep='last'), errors
+
+
+def template_csv(columns):
+    """A CSV file with just the header row, for users to fill in"""
+    return (",".join(columns) + "\n").encode()
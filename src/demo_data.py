@@ -3,8 +3,28 @@ Demo Database Module
 Uses in-memory data for testing UI without Google Sheets
 """
 import streamlit as st
+from collections import defaultdict
 from datetime import datetime, timedelta
+import pandas as pd
 import random
+from ids import generate_id
+import bulk_import
+
+# Numeric job columns (missing ones read as 0)
+JOB_NUMBER_COLUMNS = [
+    "contract_amount", "pending_change_orders", "approved_change_orders",
+    "budget_insurance", "budget_labor", "budget_stamps", "budget_material",
+    "budget_subs_bond", "budget_equipment", "budget_man_days"
+]
+COST_CATEGORIES = {
+    "insurance": "insurance_actual", "labor": "labor_actual", "stamps": "stamps_actual",
+    "material": "material_actual", "subs_bond": "subs_bond_actual",
+    "equipment": "equipment_actual", "man_days": "man_days_actual"
+}
+
+class ConflictError(Exception):
+    """A row changed since the caller read it (never raised in demo mode)"""
+
 
 # ============================================
 # DEMO DATA STORAGE (in session state)
@@ -109,10 +129,9 @@ def init_demo_data():
                         "created_at": week_ending.strftime("%Y-%m-%d")
                     })
 
-
-def generate_id():
-    """Generate unique ID"""
-    return datetime.now().strftime("%Y%m%d%H%M%S%f")
+def prefetch(*sheet_names):
+    """Nothing to load ahead in demo mode - the data is already in memory"""
+    init_demo_data()
 
 
 # ============================================
@@ -122,6 +141,10 @@ def get_all_customers():
     init_demo_data()
     return [c for c in st.session_state.customers if c.get("is_active", True)]
 
+def get_customers_df(columns=None):
+    df = pd.DataFrame(get_all_customers())
+    return df[[c for c in columns if c in df.columns]] if columns else df
+
 def get_customer_by_id(customer_id):
     init_demo_data()
     for c in st.session_state.customers:
@@ -137,7 +160,7 @@ def create_customer(data):
     st.session_state.customers.append(data)
     return data
 
-def update_customer(customer_id, data):
+def update_customer(customer_id, data, expected_version=None):
     init_demo_data()
     for i, c in enumerate(st.session_state.customers):
         if str(c["id"]) == str(customer_id):
@@ -175,7 +198,7 @@ def create_vendor(data):
     st.session_state.vendors.append(data)
     return data
 
-def update_vendor(vendor_id, data):
+def update_vendor(vendor_id, data, expected_version=None):
     init_demo_data()
     for i, v in enumerate(st.session_state.vendors):
         if str(v["id"]) == str(vendor_id):
@@ -208,6 +231,20 @@ def get_all_jobs():
     
     return jobs
 
+def get_jobs_df():
+    init_demo_data()
+    df = pd.DataFrame(st.session_state.jobs).drop(columns=["customers"], errors="ignore")
+    if df.empty:
+        return df
+    for col in JOB_NUMBER_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0) if col in df.columns else 0.0
+    df["id"] = df["id"].astype(str)
+    df["customer_id"] = df["customer_id"].astype(str)
+    customers = pd.DataFrame(st.session_state.customers)
+    names = customers.assign(id=customers["id"].astype(str)).set_index("id")["name"]
+    df["customer_name"] = df["customer_id"].map(names)
+    return df
+
 def get_active_jobs():
     return [j for j in get_all_jobs() if j.get("status") == "active"]
 
@@ -224,7 +261,7 @@ def create_job(data):
     st.session_state.jobs.append(data)
     return data
 
-def update_job(job_id, data):
+def update_job(job_id, data, expected_version=None):
     init_demo_data()
     for i, j in enumerate(st.session_state.jobs):
         if str(j["id"]) == str(job_id):
@@ -247,6 +284,13 @@ def get_weekly_costs_by_job(job_id):
     costs = [c for c in st.session_state.weekly_costs if str(c["job_id"]) == str(job_id)]
     return sorted(costs, key=lambda x: x["week_ending"], reverse=True)
 
+def get_weekly_costs_between(start_date, end_date, job_id=None):
+    init_demo_data()
+    costs = [c for c in st.session_state.weekly_costs
+             if str(start_date) <= str(c["week_ending"]) <= str(end_date)
+             and (job_id is None or str(c["job_id"]) == str(job_id))]
+    return sorted(costs, key=lambda x: x["week_ending"], reverse=True)
+
 def get_weekly_cost_entry(job_id, week_ending):
     init_demo_data()
     for c in st.session_state.weekly_costs:
@@ -254,7 +298,7 @@ def get_weekly_cost_entry(job_id, week_ending):
             return c
     return None
 
-def upsert_weekly_cost(data):
+def upsert_weekly_cost(data, expected_version=None):
     init_demo_data()
     job_id = str(data["job_id"])
     week_ending = str(data["week_ending"])
@@ -271,12 +315,25 @@ def upsert_weekly_cost(data):
     st.session_state.weekly_costs.append(data)
     return data
 
+def upsert_weekly_costs(entries, expected_versions=None):
+    inserted = updated = 0
+    for data in entries:
+        if get_weekly_cost_entry(data["job_id"], data["week_ending"]):
+            updated += 1
+        else:
+            inserted += 1
+        upsert_weekly_cost(dict(data))
+    return {"inserted": inserted, "updated": updated}
+
+def empty_cost_totals():
+    return {"insurance": 0, "labor": 0, "stamps": 0, "material": 0, 
+            "subs_bond": 0, "equipment": 0, "man_days": 0, "total": 0}
+
 def get_job_cost_totals(job_id):
     costs = get_weekly_costs_by_job(job_id)
     
     if not costs:
-        return {"insurance": 0, "labor": 0, "stamps": 0, "material": 0, 
-                "subs_bond": 0, "equipment": 0, "man_days": 0, "total": 0}
+        return empty_cost_totals()
     
     totals = {
         "insurance": sum(float(c.get("insurance_actual", 0) or 0) for c in costs),
@@ -291,6 +348,47 @@ def get_job_cost_totals(job_id):
                           totals["material"], totals["subs_bond"], totals["equipment"]])
     return totals
 
+def get_all_job_cost_totals():
+    init_demo_data()
+    all_totals = defaultdict(empty_cost_totals)
+    for c in st.session_state.weekly_costs:
+        totals = all_totals[str(c["job_id"])]
+        for key in ["insurance", "labor", "stamps", "material", "subs_bond", "equipment"]:
+            amount = float(c.get(f"{key}_actual", 0) or 0)
+            totals[key] += amount
+            totals["total"] += amount
+        totals["man_days"] += int(float(c.get("man_days_actual", 0) or 0))
+    return all_totals
+
+def get_job_cost_totals_df():
+    init_demo_data()
+    costs = pd.DataFrame(st.session_state.weekly_costs)
+    amounts = pd.DataFrame({"job_id": costs["job_id"].astype(str) if "job_id" in costs.columns else []})
+    for key, col in COST_CATEGORIES.items():
+        amounts[key] = pd.to_numeric(costs[col], errors="coerce").fillna(0) if col in costs.columns else 0.0
+    amounts["man_days"] = amounts["man_days"].astype(int)
+    grouped = amounts.groupby("job_id").sum()
+    grouped["total"] = grouped[["insurance", "labor", "stamps", "material", "subs_bond", "equipment"]].sum(axis=1)
+    return grouped
+
+def rebuild_job_totals():
+    """Totals are always summed from the weekly costs in demo mode"""
+    return len(get_job_cost_totals_df())
+
+def split_weekly_costs_by_year():
+    """Demo costs live in memory, so there is no tab to split"""
+    return 0
+
+def get_weekly_costs_df():
+    init_demo_data()
+    df = pd.DataFrame(st.session_state.weekly_costs).drop(columns=["jobs"], errors="ignore")
+    if df.empty:
+        return df
+    df["job_id"] = df["job_id"].astype(str)
+    jobs = pd.DataFrame(st.session_state.jobs)
+    jobs = jobs.assign(id=jobs["id"].astype(str)).set_index("id")[["job_number", "job_name"]]
+    return df.join(jobs, on="job_id")
+
 def get_all_weekly_costs():
     init_demo_data()
     costs = st.session_state.weekly_costs.copy()
@@ -305,6 +403,34 @@ def get_all_weekly_costs():
     
     return costs
 
+# ============================================
+# BULK IMPORT
+# ============================================
+def import_weekly_costs(chunks):
+    init_demo_data()
+    jobs = pd.DataFrame(st.session_state.jobs, columns=["id", "job_number"])
+    rows, errors = bulk_import.collect(chunks, bulk_import.coerce_costs, ["job_id", "week_ending"], jobs)
+    entries = [{key: value for key, value in data.items() if pd.notna(value)}
+               for data in rows.to_dict("records")]
+    return {**upsert_weekly_costs(entries), "errors": errors}
+
+def import_jobs(chunks):
+    init_demo_data()
+    jobs = pd.DataFrame(st.session_state.jobs, columns=["id", "job_number"])
+    customers = pd.DataFrame(st.session_state.customers, columns=["id", "name"])
+    rows, errors = bulk_import.collect(chunks, bulk_import.coerce_jobs, ["job_number"], jobs, customers)
+    by_number = {str(j["job_number"]): j for j in st.session_state.jobs}
+    inserted = updated = 0
+    for data in rows.to_dict("records"):
+        data = {key: value for key, value in data.items() if pd.notna(value)}
+        if data["job_number"] in by_number:
+            by_number[data["job_number"]].update(data)
+            updated += 1
+        else:
+            create_job({"status": "active", **data})
+            inserted += 1
+    return {"inserted": inserted, "updated": updated, "errors": errors}
+
 def initialize_sheets():
     """Dummy function for demo mode"""
     init_demo_data()
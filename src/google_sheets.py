@@ -4,11 +4,24 @@ Handles all read/write operations to Google Sheets
 """
 import streamlit as st
 import gspread
+from gspread.utils import rowcol_to_a1
+from collections import defaultdict, deque
+from contextlib import contextmanager
 from google.oauth2.service_account import Credentials
 import pandas as pd
 from datetime import datetime
+import bisect
 import json
 import os
+import re
+import threading
+import time
+from concurrent.futures import Future
+from ids import generate_id, generate_ids
+import bulk_import
+import request_scheduler
+import session_pool
+import sqlite_mirror
 
 # Google Sheets scope
 SCOPES = [
@@ -21,13 +34,140 @@ SHEET_JOBS = "Jobs"
 SHEET_CUSTOMERS = "Customers"
 SHEET_VENDORS = "Vendors"
 SHEET_WEEKLY_COSTS = "WeeklyCosts"
+SHEET_JOB_TOTALS = "JobTotals"
+# Weekly costs are kept in one tab per year of week_ending, e.g.
+# WeeklyCosts_2025 (see get_cost_tabs), so ALL_SHEETS lists the other tabs
+ALL_SHEETS = [SHEET_CUSTOMERS, SHEET_VENDORS, SHEET_JOBS, SHEET_JOB_TOTALS]
+COST_TAB_PATTERN = re.compile(re.escape(SHEET_WEEKLY_COSTS) + r"_(\d{4})")
+
+# Cost categories -> WeeklyCosts columns
+COST_CATEGORIES = {
+    "insurance": "insurance_actual", "labor": "labor_actual", "stamps": "stamps_actual",
+    "material": "material_actual", "subs_bond": "subs_bond_actual",
+    "equipment": "equipment_actual", "man_days": "man_days_actual"
+}
+
+# Parsed tabs shared by every session: (sheet name, columns or None for
+# whole rows) -> (loaded_at, DataFrame, spreadsheet modified time when loaded)
+_tab_cache = {}
+# Bumped on invalidation so a read that raced a write never caches stale data
+_tab_generation = defaultdict(int)
+_tab_cache_lock = threading.Lock()
+
+# Last answer to "when was the spreadsheet last modified?", shared briefly
+# so tabs expiring in the same render cost a single probe
+_modified_probe = {"value": None, "checked_at": 0}
+_modified_probe_lock = threading.Lock()
+
+# Open handles reused across reruns: the spreadsheet, worksheets by name,
+# each worksheet's header row and (listed_at, names) of the WeeklyCosts tabs
+_handles = {"spreadsheet": None, "worksheets": {}, "headers": {}, "cost_tabs": None}
+_handles_lock = threading.Lock()
+
+# One writer thread per tab applies that tab's mutations from every session
+# in the order they were submitted: sheet name -> {"queue": deque of
+# (kind, payload, Future, queued_at), "thread": Thread or None}
+_writers = {}
+_writers_condition = threading.Condition()
+
+# Background thread pulling the sheet into the local SQLite mirror
+_mirror_sync = {"thread": None, "synced_modified_time": None}
+_mirror_sync_lock = threading.Lock()
+
+# Column holding each row's version for optimistic concurrency checks
+VERSION_COLUMN = "updated_at"
+# One lock per row being written, so writes to different rows run in parallel
+_row_locks = defaultdict(threading.RLock)
+_row_locks_lock = threading.Lock()
+# One RowPositions per tab, keeping the row numbers writers located from
+# being shifted by a delete before their write lands
+_row_positions = {}
+
+# Row index of each WeeklyCosts tab: tab -> {"rows": {(job_id, week_ending):
+# sheet row number}, "built_at": ...}, kept current by upsert_weekly_cost and
+# delete_job and rebuilt once it is older than the cache TTL
+_cost_index = {}
+_cost_index_lock = threading.Lock()
+
+# Held while JobTotals is changed, so a rebuild never races a delta
+_job_totals_lock = threading.RLock()
+
+
+class RowPositions:
+    """
+    Guards a tab's row numbers. Code that finds rows by number and then
+    writes to them holds it shared from the lookup until the write has
+    landed, so any number of those run (and get merged by the tab's writer)
+    together. Deleting or reordering rows shifts the rows below, so it holds
+    it exclusively: it waits for the shared holders to finish, and new ones
+    wait for it. Both are re-entrant for the thread holding them.
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._shared = defaultdict(int)
+        self._owner = None
+        self._depth = 0
+        self._deletes_waiting = 0
+    
+    @contextmanager
+    def shared(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._owner != me and not self._shared[me]:
+                # Waiting deletes go first, so a stream of updates can't starve them
+                while self._owner is not None or self._deletes_waiting:
+                    self._condition.wait()
+            self._shared[me] += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._shared[me] -= 1
+                if not self._shared[me]:
+                    del self._shared[me]
+                    self._condition.notify_all()
+    
+    @contextmanager
+    def exclusive(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._owner != me:
+                self._deletes_waiting += 1
+                while self._owner is not None or self._shared:
+                    self._condition.wait()
+                self._deletes_waiting -= 1
+                self._owner = me
+            self._depth += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._depth -= 1
+                if not self._depth:
+                    self._owner = None
+                    self._condition.notify_all()
+
+
+class ConflictError(Exception):
+    """A row changed since the caller read it, so the update was not written"""
+    
+    def __init__(self, sheet_name, key, expected_version, current_version):
+        super().__init__(f"{sheet_name} row {key} was changed by someone else "
+                         f"(expected version {expected_version!r}, found {current_version!r})")
+        self.sheet_name = sheet_name
+        self.key = key
+        self.expected_version = expected_version
+        self.current_version = current_version
 
 
 @st.cache_resource
 def get_google_sheets_client():
     """
     Create and cache Google Sheets client connection.
-    Uses service account credentials from secrets or file.
+    Uses service account credentials from secrets or file. Requests go out
+    over a pool of SHEETS_SESSION_POOL_SIZE (default 4) keep-alive,
+    gzip-compressed HTTP sessions, one per request in flight.
     """
     try:
         # Try Streamlit secrets first (for deployment)
@@ -43,104 +183,1000 @@ def get_google_sheets_client():
                 st.error("⚠️ Google credentials not found. See README for setup instructions.")
                 st.stop()
         
-        client = gspread.authorize(creds)
+        pool = session_pool.SessionPool(
+            creds, size=get_setting("SHEETS_SESSION_POOL_SIZE", session_pool.POOL_SIZE))
+        client = gspread.Client(auth=creds, session=pool)
         return client
     except Exception as e:
         st.error(f"⚠️ Failed to connect to Google Sheets: {e}")
         st.stop()
 
 
+def get_setting(name, default=None):
+    """Read a setting from Streamlit secrets, falling back to the environment"""
+    try:
+        return st.secrets.get(name, os.getenv(name, default))
+    except:
+        return os.getenv(name, default)
+
+
 def get_spreadsheet():
-    """Get the main spreadsheet"""
+    """Get the main spreadsheet (opened once and reused)"""
+    if _handles["spreadsheet"] is not None:
+        return _handles["spreadsheet"]
+    
     client = get_google_sheets_client()
     
     # Try to get spreadsheet ID from secrets or environment
-    try:
-        spreadsheet_id = st.secrets.get("SPREADSHEET_ID", os.getenv("SPREADSHEET_ID"))
-    except:
-        spreadsheet_id = os.getenv("SPREADSHEET_ID")
+    spreadsheet_id = get_setting("SPREADSHEET_ID")
     
     if not spreadsheet_id:
         st.error("⚠️ SPREADSHEET_ID not configured. Add it to .streamlit/secrets.toml or .env")
         st.stop()
     
-    return client.open_by_key(spreadsheet_id)
+    request_scheduler.configure(
+        reads_per_minute=get_setting("SHEETS_READS_PER_MINUTE"),
+        writes_per_minute=get_setting("SHEETS_WRITES_PER_MINUTE"),
+        max_retries=get_setting("SHEETS_MAX_RETRIES")
+    )
+    spreadsheet = request_scheduler.read(client.open_by_key, spreadsheet_id)
+    with _handles_lock:
+        _handles["spreadsheet"] = spreadsheet
+    return spreadsheet
 
 
-def get_worksheet(sheet_name):
-    """Get a specific worksheet (tab) by name"""
+def get_worksheet(sheet_name, create=True):
+    """
+    Get a specific worksheet (tab) by name (looked up once and reused).
+    A missing tab is created, unless create is False: then None is returned.
+    """
+    worksheet = _handles["worksheets"].get(sheet_name)
+    if worksheet is not None:
+        return worksheet
+    
     spreadsheet = get_spreadsheet()
     try:
-        return spreadsheet.worksheet(sheet_name)
+        worksheet = request_scheduler.read(spreadsheet.worksheet, sheet_name)
     except gspread.WorksheetNotFound:
+        if not create:
+            return None
         # Create the worksheet if it doesn't exist
-        return create_worksheet(spreadsheet, sheet_name)
+        worksheet = create_worksheet(spreadsheet, sheet_name)
+        if base_sheet(sheet_name) == SHEET_WEEKLY_COSTS:
+            with _handles_lock:
+                _handles["cost_tabs"] = None
+    with _handles_lock:
+        _handles["worksheets"][sheet_name] = worksheet
+    return worksheet
+
+
+def get_headers(sheet_name):
+    """Get the header row of a tab (read once, then kept in sync by read_sheet)"""
+    headers = _handles["headers"].get(sheet_name)
+    if headers is None:
+        headers = request_scheduler.read(get_worksheet(sheet_name).row_values, 1)
+        remember_headers(sheet_name, headers)
+    return headers
+
+
+def get_header_map(sheet_name):
+    """Map each header of a tab to its 1-based column number"""
+    return {header: col for col, header in enumerate(get_headers(sheet_name), start=1)}
+
+
+def remember_headers(sheet_name, headers):
+    """Record a tab's header row, e.g. after a read shows the columns changed"""
+    with _handles_lock:
+        _handles["headers"][sheet_name] = list(headers)
+
+
+def reset_handles(*sheet_names):
+    """Forget cached handles so they are looked up again (all if none given)"""
+    with _handles_lock:
+        if not sheet_names:
+            _handles["spreadsheet"] = None
+            _handles["worksheets"].clear()
+            _handles["headers"].clear()
+        for sheet_name in sheet_names:
+            _handles["worksheets"].pop(sheet_name, None)
+            _handles["headers"].pop(sheet_name, None)
+        _handles["cost_tabs"] = None
+
+
+def base_sheet(sheet_name):
+    """The tab a yearly tab belongs to (WeeklyCosts for WeeklyCosts_2025), else the name itself"""
+    return SHEET_WEEKLY_COSTS if COST_TAB_PATTERN.fullmatch(sheet_name) else sheet_name
+
+
+def cost_tab(week_ending):
+    """The tab new weekly cost entries of a week go to: one per year, e.g. WeeklyCosts_2025"""
+    return f"{SHEET_WEEKLY_COSTS}_{pd.Timestamp(str(week_ending)).year}"
+
+
+def get_cost_tabs():
+    """
+    The WeeklyCosts tabs that exist, in order: a WeeklyCosts tab from before
+    costs were split by year (while there is one), then each year's tab.
+    Listed once and reused for the cache TTL, so tabs other processes add show up.
+    """
+    ttl = float(get_setting("SHEETS_CACHE_TTL", 60))
+    with _handles_lock:
+        listed = _handles["cost_tabs"]
+    if listed is None or time.monotonic() - listed[0] >= ttl:
+        listed_at = time.monotonic()
+        worksheets = request_scheduler.read(get_spreadsheet().worksheets)
+        tabs = sorted(ws.title for ws in worksheets if base_sheet(ws.title) == SHEET_WEEKLY_COSTS)
+        listed = (listed_at, tabs)
+        with _handles_lock:
+            _handles["cost_tabs"] = listed
+    return list(listed[1])
+
+
+def cost_tabs_between(start_date=None, end_date=None):
+    """The existing WeeklyCosts tabs that can hold weeks from start_date to end_date (all without them)"""
+    first = pd.Timestamp(str(start_date)).year if start_date else 0
+    last = pd.Timestamp(str(end_date)).year if end_date else 9999
+    return [tab for tab in get_cost_tabs()
+            if tab == SHEET_WEEKLY_COSTS or first <= int(tab[-4:]) <= last]
+
+
+# Headers of each tab, in sheet order, with the dtype each column gets once
+# loaded: string for ids, category for repeated values, datetime64 for dates,
+# float64 for amounts and bool for flags. object columns are left as read.
+TAB_SCHEMAS = {
+    SHEET_JOBS: {
+        "id": "string", "job_number": "object", "job_name": "object",
+        "customer_id": "category", "contract_amount": "float64",
+        "pending_change_orders": "float64", "approved_change_orders": "float64",
+        "status": "category", "start_date": "datetime64[ns]", "end_date": "datetime64[ns]",
+        "budget_insurance": "float64", "budget_labor": "float64",
+        "budget_stamps": "float64", "budget_material": "float64",
+        "budget_subs_bond": "float64", "budget_equipment": "float64",
+        "budget_man_days": "float64", "notes": "object",
+        "created_at": "object", "updated_at": "object"
+    },
+    SHEET_CUSTOMERS: {
+        "id": "string", "name": "object", "contact_name": "object", "phone": "object",
+        "email": "object", "address": "object", "notes": "object",
+        "is_active": "bool", "created_at": "object", "updated_at": "object"
+    },
+    SHEET_VENDORS: {
+        "id": "string", "name": "object", "vendor_type": "category",
+        "contact_name": "object", "phone": "object", "email": "object",
+        "address": "object", "notes": "object", "is_active": "bool",
+        "created_at": "object", "updated_at": "object"
+    },
+    SHEET_WEEKLY_COSTS: {
+        "id": "string", "job_id": "category", "week_ending": "datetime64[ns]",
+        "insurance_actual": "float64", "labor_actual": "float64",
+        "stamps_actual": "float64", "material_actual": "float64",
+        "subs_bond_actual": "float64", "equipment_actual": "float64",
+        "man_days_actual": "float64", "notes": "object",
+        "created_at": "object", "updated_at": "object"
+    },
+    SHEET_JOB_TOTALS: {
+        "job_id": "string", "insurance": "float64", "labor": "float64",
+        "stamps": "float64", "material": "float64", "subs_bond": "float64",
+        "equipment": "float64", "man_days": "float64", "total": "float64",
+        "updated_at": "object"
+    }
+}
 
 
 def create_worksheet(spreadsheet, sheet_name):
     """Create a new worksheet with appropriate headers"""
-    headers = {
-        SHEET_JOBS: [
-            "id", "job_number", "job_name", "customer_id", "contract_amount",
-            "pending_change_orders", "approved_change_orders", "status",
-            "start_date", "end_date", "budget_insurance", "budget_labor",
-            "budget_stamps", "budget_material", "budget_subs_bond",
-            "budget_equipment", "budget_man_days", "notes", "created_at", "updated_at"
-        ],
-        SHEET_CUSTOMERS: [
-            "id", "name", "contact_name", "phone", "email", "address",
-            "notes", "is_active", "created_at"
-        ],
-        SHEET_VENDORS: [
-            "id", "name", "vendor_type", "contact_name", "phone", "email",
-            "address", "notes", "is_active", "created_at"
-        ],
-        SHEET_WEEKLY_COSTS: [
-            "id", "job_id", "week_ending", "insurance_actual", "labor_actual",
-            "stamps_actual", "material_actual", "subs_bond_actual",
-            "equipment_actual", "man_days_actual", "notes", "created_at"
-        ]
-    }
-    
-    worksheet = spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=25)
-    if sheet_name in headers:
-        worksheet.append_row(headers[sheet_name])
+    worksheet = request_scheduler.write(spreadsheet.add_worksheet, title=sheet_name, rows=1000, cols=25)
+    if base_sheet(sheet_name) in TAB_SCHEMAS:
+        headers = list(TAB_SCHEMAS[base_sheet(sheet_name)])
+        request_scheduler.write(worksheet.append_row, headers)
+        remember_headers(sheet_name, headers)
     return worksheet
 
 
-def generate_id():
-    """Generate a unique ID"""
-    return datetime.now().strftime("%Y%m%d%H%M%S%f")
+def values_to_dataframe(sheet_name, values):
+    """
+    Parse a tab's cell values (header row first) into a DataFrame the way
+    get_all_records does: short rows padded, numbers converted (see
+    numericise_untyped).
+    """
+    if not values:
+        return pd.DataFrame()
+    headers = values[0]
+    # Pick up columns added or moved directly in Google Sheets
+    if headers != _handles["headers"].get(sheet_name):
+        remember_headers(sheet_name, headers)
+    width = len(headers)
+    rows = [(row + [''] * width)[:width] for row in values[1:]]
+    return numericise_untyped(sheet_name, pd.DataFrame(rows, columns=headers))
+
+
+# A cell numericise_all would turn into an int or float
+NUMBER_PATTERN = r'\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*'
+
+
+def numericise_untyped(sheet_name, df):
+    """
+    Turn the cells that look like numbers into ints and floats, as
+    get_all_records does, in the columns apply_column_types leaves as read
+    (object in TAB_SCHEMAS, or not in it). The other columns stay text for
+    apply_column_types to convert whole.
+    """
+    schema = TAB_SCHEMAS.get(base_sheet(sheet_name), {})
+    for position, column in enumerate(df.columns):
+        values = df.iloc[:, position]
+        # Columns of blank padding hold no text to parse
+        if schema.get(column, "object") != "object" or not pd.api.types.is_string_dtype(values):
+            continue
+        # Thousands separators are dropped, as in numericise_all
+        text = values.str.replace(',', '', regex=False)
+        # Only cells shaped like a number are parsed, which is much quicker
+        # than letting to_numeric fail on every date and note
+        found = text.str.fullmatch(NUMBER_PATTERN).to_numpy(dtype=bool)
+        if not found.any():
+            continue
+        cells = values.to_numpy(dtype=object).copy()
+        cells[found] = pd.to_numeric(text[found]).to_numpy(dtype=object)
+        # Whole numbers as ints, exact even past float precision
+        whole = found & text.str.fullmatch(r'\s*[+-]?\d+\s*').to_numpy(dtype=bool)
+        cells[whole] = [int(value) for value in text[whole]]
+        df.isetitem(position, pd.Series(cells, index=df.index, dtype=object).infer_objects())
+    return df
 
 
 def sheet_to_dataframe(worksheet):
     """Convert worksheet to pandas DataFrame"""
-    data = worksheet.get_all_records()
-    return pd.DataFrame(data) if data else pd.DataFrame()
+    values = request_scheduler.read(worksheet.get_all_values)
+    return values_to_dataframe(worksheet.title, values)
+
+
+def apply_column_types(sheet_name, df):
+    """
+    Convert a tab's columns to their TAB_SCHEMAS dtypes in one vectorized
+    pass. Blank or invalid amounts become 0, blank dates NaT, and only an
+    explicit false value makes a flag False, so blank rows stay active.
+    """
+    for column, dtype in TAB_SCHEMAS.get(base_sheet(sheet_name), {}).items():
+        if column not in df.columns or dtype == "object":
+            continue
+        values = df[column]
+        if dtype == "float64":
+            if not pd.api.types.is_numeric_dtype(values):
+                # Cells formatted with thousands separators, e.g. 1,250.00
+                values = values.astype(str).str.replace(',', '', regex=False)
+            df[column] = pd.to_numeric(values, errors='coerce').fillna(0).astype('float64')
+        elif dtype == "datetime64[ns]":
+            df[column] = pd.to_datetime(values.astype(str), errors='coerce', format='mixed')
+        elif dtype == "bool":
+            text = values.astype(str).str.strip().str.lower()
+            df[column] = ~text.isin(['false', '0', '0.0', 'no'])
+        else:
+            # Cells are read as numbers where they look like one; keys compare as text
+            df[column] = values.astype(str).astype(dtype)
+    return df
+
+
+def date_text(values):
+    """Dates as YYYY-MM-DD text (blank for missing); other columns as text"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.strftime('%Y-%m-%d').fillna('')
+    return values.astype(str)
+
+
+def to_records(df):
+    """DataFrame rows as dicts for the dict-based API, with dates as YYYY-MM-DD text"""
+    dates = {
+        column: date_text(df[column]) for column in df.columns
+        if pd.api.types.is_datetime64_any_dtype(df[column])
+    }
+    return df.assign(**dates).to_dict('records')
+
+
+def tab_range(sheet_name):
+    """A1 range covering a whole tab"""
+    return "'" + sheet_name.replace("'", "''") + "'"
+
+
+def column_ranges(sheet_name, columns):
+    """
+    A1 ranges (one per column) for the requested headers the tab has.
+    Returns (found_columns, ranges).
+    """
+    header_map = get_header_map(sheet_name)
+    found = [column for column in columns if column in header_map]
+    ranges = []
+    for column in found:
+        letter = rowcol_to_a1(1, header_map[column])[:-1]
+        ranges.append(f"{tab_range(sheet_name)}!{letter}:{letter}")
+    return found, ranges
+
+
+def columns_to_dataframe(columns, value_ranges):
+    """
+    Parse single-column value ranges (header cell first) into a DataFrame.
+    Returns None if a header cell doesn't match, i.e. the columns moved.
+    """
+    data = {}
+    for column, value_range in zip(columns, value_ranges):
+        values = [row[0] if row else '' for row in value_range.get('values', [])]
+        if not values or values[0] != column:
+            return None
+        data[column] = values[1:]
+    # Blank cells at the bottom of a column are left out, so pad to the longest
+    length = max((len(values) for values in data.values()), default=0)
+    return pd.DataFrame({
+        column: values + [''] * (length - len(values))
+        for column, values in data.items()
+    }, columns=columns)
+
+
+def fetch_tabs(keys):
+    """
+    Download tabs from Google Sheets in a single values batch-get request,
+    bypassing the cache and the mirror. Each key is (sheet_name, columns):
+    columns None for whole rows, or a tuple of headers to fetch only those
+    column ranges. Tabs that don't exist read as empty. Returns {key: DataFrame}.
+    """
+    keys = list(keys)
+    frames = {}
+    for attempt in range(2):
+        pending = [key for key in keys if key not in frames]
+        if not pending:
+            break
+        
+        missing = set()
+        
+        def batch_get():
+            requests = []
+            for sheet_name, columns in pending:
+                # Reading never creates a tab, e.g. one deleted since it was listed
+                if get_worksheet(sheet_name, create=False) is None:
+                    missing.add(sheet_name)
+                    requests.append(([], []))
+                elif columns is None:
+                    requests.append((None, [tab_range(sheet_name)]))
+                else:
+                    requests.append(column_ranges(sheet_name, columns))
+            ranges = [r for _, key_ranges in requests for r in key_ranges]
+            if not ranges:
+                return requests, []
+            response = request_scheduler.read(get_spreadsheet().values_batch_get, ranges)
+            return requests, response.get('valueRanges', [])
+        
+        try:
+            requests, value_ranges = batch_get()
+        except gspread.exceptions.APIError:
+            # A cached handle may point at a tab that was deleted or renamed
+            reset_handles(*{sheet_name for sheet_name, _ in pending})
+            requests, value_ranges = batch_get()
+        
+        position = 0
+        for (sheet_name, columns), (found, key_ranges) in zip(pending, requests):
+            key_values = value_ranges[position:position + len(key_ranges)]
+            position += len(key_ranges)
+            if sheet_name in missing:
+                headers = list(TAB_SCHEMAS.get(base_sheet(sheet_name), {}))
+                frames[(sheet_name, columns)] = pd.DataFrame(
+                    columns=headers if columns is None else [c for c in columns if c in headers])
+                continue
+            if columns is None:
+                values = key_values[0].get('values', []) if key_values else []
+                frames[(sheet_name, columns)] = values_to_dataframe(sheet_name, values)
+                continue
+            df = columns_to_dataframe(found, key_values)
+            if df is None and attempt == 0:
+                # Columns were moved in Google Sheets - re-read the headers and retry
+                reset_handles(sheet_name)
+                continue
+            frames[(sheet_name, columns)] = numericise_untyped(sheet_name, df) if df is not None else pd.DataFrame()
+    return frames
+
+
+def fetch_sheets(sheet_names):
+    """Download whole tabs in one request. Returns {sheet_name: DataFrame}."""
+    frames = fetch_tabs((sheet_name, None) for sheet_name in sheet_names)
+    return {sheet_name: df for (sheet_name, _), df in frames.items()}
+
+
+def fetch_sheet(sheet_name):
+    """Download a tab from Google Sheets, bypassing the cache and the mirror"""
+    return fetch_tabs([(sheet_name, None)])[(sheet_name, None)]
+
+
+def fetch_columns(sheet_name, columns):
+    """Download only some columns of a tab, bypassing the cache and the mirror"""
+    key = (sheet_name, tuple(columns))
+    return fetch_tabs([key])[key]
+
+
+def fetch_rows(sheet_name, row_numbers, max_gap=20):
+    """
+    Download only some rows of a tab (by sheet row number), bypassing the
+    cache and the mirror. Rows up to max_gap apart are fetched as one range,
+    so the result can include a few rows in between: callers filter it.
+    """
+    spans = []
+    for row_number in sorted(set(row_numbers)):
+        if spans and row_number - spans[-1][1] <= max_gap:
+            spans[-1][1] = row_number
+        else:
+            spans.append([row_number, row_number])
+    if not spans:
+        return pd.DataFrame(columns=get_headers(sheet_name))
+    
+    tab = tab_range(sheet_name)
+    ranges = [f"{tab}!1:1"] + [f"{tab}!{first}:{last}" for first, last in spans]
+    response = request_scheduler.read(get_spreadsheet().values_batch_get, ranges)
+    values = [row for value_range in response.get('valueRanges', [])
+              for row in value_range.get('values', [])]
+    return values_to_dataframe(sheet_name, values)
+
+
+def project(df, columns):
+    """The requested columns of a DataFrame (those it has)"""
+    return df[[column for column in columns if column in df.columns]]
+
+
+def _fresh_from_cache(key, ttl):
+    """Cached DataFrame for a (sheet_name, columns) key if it is still fresh, else None"""
+    with _tab_cache_lock:
+        cached = _tab_cache.get(key)
+    if cached and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    return None
+
+
+def load_snapshot(keys):
+    """
+    Refresh the requested (sheet_name, columns) cache entries that aren't
+    fresh, using at most one metadata probe and one batch-get request, so a
+    page render sees all the tabs it asks for as of the same moment. Other
+    cached entries are left alone. Returns {key: DataFrame}; treat the
+    frames as read-only.
+    """
+    keys = list(keys)
+    ttl = float(get_setting("SHEETS_CACHE_TTL", 60))
+    snapshot = {}
+    for key in keys:
+        df = _fresh_from_cache(key, ttl)
+        if df is not None:
+            snapshot[key] = df
+    if len(snapshot) == len(keys):
+        return snapshot
+    
+    with _tab_cache_lock:
+        stale = list(dict.fromkeys(key for key in keys if key not in snapshot))
+        cached = {key: _tab_cache.get(key) for key in stale}
+        generations = {key: _tab_generation[key[0]] for key in stale}
+    loaded_at = time.monotonic()
+    
+    # Expired: one metadata probe tells us whether the tabs can have changed
+    modified_time = get_modified_time()
+    loaded = {}
+    for key in stale:
+        entry = cached[key]
+        if entry and modified_time is not None and entry[2] == modified_time:
+            loaded[key] = entry[1]
+    to_fetch = [key for key in stale if key not in loaded]
+    # Projections of a tab that is downloaded whole anyway come from that copy
+    derived = [key for key in to_fetch if key[1] and (key[0], None) in to_fetch]
+    to_fetch = [key for key in to_fetch if key not in derived]
+    
+    fetched = {}
+    mirror_path = get_mirror_path()
+    if mirror_path:
+        start_mirror_sync()
+        missing = []
+        for sheet_name, columns in to_fetch:
+            if sqlite_mirror.has_table(mirror_path, sheet_name):
+                fetched[(sheet_name, columns)] = sqlite_mirror.load_tab(
+                    mirror_path, sheet_name, columns=columns)
+            else:
+                missing.append((sheet_name, columns))
+        frames = pull_to_mirror(*dict.fromkeys(sheet_name for sheet_name, _ in missing))
+        for sheet_name, columns in missing:
+            df = frames[sheet_name]
+            fetched[(sheet_name, columns)] = project(df, columns).copy() if columns else df.copy()
+    else:
+        fetched = fetch_tabs(to_fetch)
+    for (sheet_name, columns), df in fetched.items():
+        loaded[(sheet_name, columns)] = apply_column_types(sheet_name, df)
+    for sheet_name, columns in derived:
+        loaded[(sheet_name, columns)] = project(loaded[(sheet_name, None)], columns)
+    
+    with _tab_cache_lock:
+        for key, df in loaded.items():
+            if _tab_generation[key[0]] == generations[key]:
+                _tab_cache[key] = (loaded_at, df, modified_time)
+    snapshot.update(loaded)
+    return {key: snapshot[key] for key in keys}
+
+
+def read_sheet(sheet_name, columns=None):
+    """
+    Get a tab as a DataFrame, served from the shared cache while fresh.
+    Pass columns (a list of headers) when only those are needed: just those
+    column ranges are downloaded.
+    Entries expire after SHEETS_CACHE_TTL seconds (default 60) or when a write
+    to the tab invalidates them. Callers get a copy they are free to modify.
+    Misses are refreshed through load_snapshot. With LOCAL_MIRROR_PATH set, misses are
+    served from the SQLite mirror.
+    """
+    return read_sheets([(sheet_name, columns)])[0]
+
+
+def read_sheets(requests):
+    """
+    read_sheet for several tabs at once: requests is a list of
+    (sheet_name, columns or None) and a DataFrame is returned for each, in
+    order. Every miss is fetched in the same batch request, so a page that
+    needs several tabs waits for one round trip instead of one per tab.
+    """
+    ttl = float(get_setting("SHEETS_CACHE_TTL", 60))
+    keys = [(sheet_name, tuple(columns) if columns else None) for sheet_name, columns in requests]
+    frames = {}
+    for key in keys:
+        df = _fresh_from_cache(key, ttl)
+        if df is None and key[1]:
+            # A fresh copy of the whole tab answers any projection
+            full = _fresh_from_cache((key[0], None), ttl)
+            if full is not None:
+                df = project(full, list(key[1]))
+        if df is not None:
+            frames[key] = df
+    missing = [key for key in keys if key not in frames]
+    if missing:
+        frames.update(load_snapshot(missing))
+    return [frames[key].copy() for key in keys]
+
+
+def prefetch(*sheet_names):
+    """
+    Load whole tabs a page is about to read into the cache, in one request.
+    WeeklyCosts stands for all of its yearly tabs.
+    """
+    tabs = [tab for sheet_name in sheet_names
+            for tab in (get_cost_tabs() if sheet_name == SHEET_WEEKLY_COSTS else [sheet_name])]
+    read_sheets([(tab, None) for tab in tabs])
+
+
+def get_modified_time():
+    """
+    Get the spreadsheet's last modified time from Drive metadata - a cheap
+    check before re-downloading tabs. Returns None if it can't be read.
+    """
+    with _modified_probe_lock:
+        if time.monotonic() - _modified_probe["checked_at"] < 2:
+            return _modified_probe["value"]
+    
+    checked_at = time.monotonic()
+    try:
+        spreadsheet = get_spreadsheet()
+        if hasattr(spreadsheet, "get_lastUpdateTime"):
+            value = request_scheduler.read(spreadsheet.get_lastUpdateTime)
+        else:
+            value = request_scheduler.read(getattr, spreadsheet, "lastUpdateTime")
+    except Exception:
+        value = None
+    with _modified_probe_lock:
+        _modified_probe["value"] = value
+        _modified_probe["checked_at"] = checked_at
+    return value
+
+
+def invalidate_cache(*sheet_names):
+    """
+    Drop cached tabs so the next read goes to the sheet (all tabs if none
+    given)
+    """
+    with _tab_cache_lock:
+        # Including tabs whose first load is still in flight
+        for sheet_name in sheet_names or set(_tab_generation) | {key[0] for key in _tab_cache}:
+            _tab_generation[sheet_name] += 1
+        for key in list(_tab_cache):
+            if not sheet_names or key[0] in sheet_names:
+                del _tab_cache[key]
+    # Our own write just changed the modified time
+    with _modified_probe_lock:
+        _modified_probe["checked_at"] = 0
+
+
+# ============================================
+# LOCAL SQLITE MIRROR
+# ============================================
+def get_mirror_path():
+    """Path of the local SQLite mirror, or None when it isn't enabled"""
+    return get_setting("LOCAL_MIRROR_PATH") or None
+
+
+def mirror_write(operation, *args):
+    """Apply a write that already succeeded on the sheet to the mirror"""
+    mirror_path = get_mirror_path()
+    if mirror_path:
+        operation(mirror_path, *args)
+
+
+def pull_to_mirror(*sheet_names):
+    """
+    Download tabs in one request and store them in the mirror, skipping any
+    tab a local write raced. Returns {sheet_name: DataFrame}.
+    """
+    generations = {name: sqlite_mirror.generation(name) for name in sheet_names}
+    frames = fetch_sheets(sheet_names)
+    for sheet_name, df in frames.items():
+        if df.columns.empty:
+            # A tab with only a header row still needs its columns in the mirror
+            df = frames[sheet_name] = pd.DataFrame(columns=get_headers(sheet_name))
+        if sqlite_mirror.store_tab(get_mirror_path(), sheet_name, df,
+                                   if_generation=generations[sheet_name]):
+            invalidate_cache(sheet_name)
+    return frames
+
+
+def sync_mirror():
+    """
+    Pull every tab into the mirror to pick up edits made in Google Sheets.
+    Skipped when the spreadsheet hasn't been modified since the last pull.
+    """
+    modified_time = get_modified_time()
+    if modified_time is not None and modified_time == _mirror_sync["synced_modified_time"]:
+        return
+    pull_to_mirror(*ALL_SHEETS, *get_cost_tabs())
+    _mirror_sync["synced_modified_time"] = modified_time
+
+
+def start_mirror_sync():
+    """Start the background mirror sync (once per process)"""
+    with _mirror_sync_lock:
+        if _mirror_sync["thread"] is not None:
+            return
+        # Open the handles here so the sync thread never has to
+        get_spreadsheet()
+        thread = threading.Thread(target=_mirror_sync_loop, daemon=True)
+        _mirror_sync["thread"] = thread
+    thread.start()
+
+
+def _mirror_sync_loop():
+    while True:
+        time.sleep(float(get_setting("MIRROR_SYNC_SECONDS", 30)))
+        try:
+            with request_scheduler.bulk():
+                sync_mirror()
+        except Exception:
+            # Keep serving the last good copy and try again next round
+            pass
+
+
+def find_rows(sheet_name, column, value):
+    """
+    Find the sheet row numbers (header is row 1) of every row whose
+    `column` equals `value`. Only that one column is downloaded.
+    """
+    col = get_header_map(sheet_name).get(column)
+    if col is None:
+        return []
+    cells = request_scheduler.read(get_worksheet(sheet_name).col_values, col)
+    return [row_number for row_number, cell in enumerate(cells[1:], start=2)
+            if str(cell) == str(value)]
+
+
+def find_row(sheet_name, column, value):
+    """Find the sheet row number of the first row whose `column` equals `value`"""
+    row_numbers = find_rows(sheet_name, column, value)
+    return row_numbers[0] if row_numbers else None
+
+
+def new_version():
+    """A fresh row version (the update time, to the microsecond)"""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def ensure_column(sheet_name, column):
+    """Add a header to a tab that doesn't have it yet (e.g. tabs created before it existed)"""
+    if column in get_headers(sheet_name):
+        return
+    
+    def add_header():
+        # Checked again on the writer, where another session may have added it
+        headers = get_headers(sheet_name)
+        if column in headers:
+            return False
+        worksheet = get_worksheet(sheet_name)
+        if len(headers) >= worksheet.col_count:
+            request_scheduler.write(worksheet.add_cols, 1)
+        request_scheduler.write(worksheet.update_cell, 1, len(headers) + 1, column)
+        remember_headers(sheet_name, headers + [column])
+        return True
+    
+    if not submit_write(sheet_name, "call", add_header):
+        return
+    invalidate_cache(sheet_name)
+    if get_mirror_path():
+        pull_to_mirror(sheet_name)
+
+
+def row_lock(sheet_name, key):
+    """The lock serializing this process's writes to one row"""
+    with _row_locks_lock:
+        return _row_locks[(sheet_name, key)]
+
+
+def row_positions(sheet_name):
+    """The RowPositions guarding a tab's row numbers in this process"""
+    with _row_locks_lock:
+        return _row_positions.setdefault(sheet_name, RowPositions())
+
+
+def write_versioned(sheet_name, key, locate, data, expected_version=None):
+    """
+    Write fields of one row and give it a new version. locate() returns
+    (row_number, row_values) for the row, or (None, None). If
+    expected_version is given and the row's stored version differs, someone
+    else saved it since the caller read it: ConflictError is raised and
+    nothing is written. Returns the row number, or None if there's no row.
+    The row can't be moved by a delete between locate() and the write.
+    """
+    ensure_column(sheet_name, VERSION_COLUMN)
+    with row_lock(sheet_name, key), row_positions(sheet_name).shared():
+        row_number, values = locate()
+        if row_number is None:
+            return None
+        if expected_version is not None:
+            col = get_header_map(sheet_name)[VERSION_COLUMN]
+            current_version = str(values[col - 1]) if len(values) >= col else ''
+            if current_version != str(expected_version):
+                # The cached copy is stale too - let the caller reload it
+                invalidate_cache(sheet_name)
+                raise ConflictError(sheet_name, key, expected_version, current_version)
+        data[VERSION_COLUMN] = new_version()
+        update_row(sheet_name, row_number, data)
+    return row_number
+
+
+def locate_by_id(sheet_name, row_id, with_values):
+    """locate() for write_versioned: the row with this id and, if asked, its values"""
+    def locate():
+        row_number = find_row(sheet_name, 'id', row_id)
+        if row_number is None or not with_values:
+            return row_number, []
+        values = request_scheduler.read(get_worksheet(sheet_name).row_values, row_number)
+        col = get_header_map(sheet_name)['id']
+        if len(values) < col or str(values[col - 1]) != str(row_id):
+            # The row moved between the two reads - look it up again
+            return locate()
+        return row_number, values
+    return locate
+
+
+def submit_write(sheet_name, kind, payload):
+    """
+    Hand a mutation to the tab's writer and wait for its result. kind is
+    "append" (one row), "update" (batch_update ranges), "delete" (spreadsheet
+    batch_update requests) or "call" (a function run on its own). Every
+    session's writes to a tab go through that one thread, so they never
+    interleave, and queued mutations of the same kind go out as one request.
+    """
+    # Resolve the handle here so the writer never has to open it
+    get_worksheet(sheet_name)
+    
+    future = Future()
+    with _writers_condition:
+        writer = _writers.setdefault(sheet_name, {"queue": deque(), "thread": None})
+        writer["queue"].append((kind, payload, future, time.monotonic()))
+        if writer["thread"] is None:
+            writer["thread"] = threading.Thread(target=_writer_loop, args=(sheet_name,),
+                                                name=f"sheets-writer-{sheet_name}", daemon=True)
+            writer["thread"].start()
+        _writers_condition.notify_all()
+    return future.result()
+
+
+def _writer_loop(sheet_name):
+    """Apply a tab's queued mutations in order; stop after a minute idle"""
+    writer = _writers[sheet_name]
+    while True:
+        with _writers_condition:
+            idle_until = time.monotonic() + 60
+            while not writer["queue"]:
+                if time.monotonic() >= idle_until:
+                    writer["thread"] = None
+                    return
+                _writers_condition.wait(timeout=idle_until - time.monotonic())
+            
+            # Rows appended within SHEETS_APPEND_FLUSH_SECONDS (default 0.5)
+            # of the first one go out together in one append_rows call
+            delay = float(get_setting("SHEETS_APPEND_FLUSH_SECONDS", 0.5))
+            kind, _, _, queued_at = writer["queue"][0]
+            while kind == "append" and time.monotonic() < queued_at + delay:
+                _writers_condition.wait(timeout=queued_at + delay - time.monotonic())
+            
+            batch = list(writer["queue"])
+            writer["queue"].clear()
+        
+        # Merge runs of adjacent mutations of the same kind, keeping their order
+        runs = []
+        for op in batch:
+            if runs and runs[-1][0][0] == op[0] and op[0] != "call":
+                runs[-1].append(op)
+            else:
+                runs.append([op])
+        for run in runs:
+            _apply_run(sheet_name, run)
+
+
+def _apply_run(sheet_name, run):
+    """Write a run of merged mutations, settling each one's Future"""
+    try:
+        results = _write_merged(sheet_name, run[0][0], [payload for _, payload, _, _ in run])
+    except Exception as e:
+        if len(run) > 1:
+            # Don't fail every session for one bad mutation - try them one by one
+            for op in run:
+                _apply_run(sheet_name, [op])
+            return
+        run[0][2].set_exception(e)
+        return
+    for (_, _, future, _), result in zip(run, results):
+        future.set_result(result)
+
+
+def _write_merged(sheet_name, kind, payloads):
+    """Send mutations of one kind as a single request; returns a result per mutation"""
+    if kind == "append":
+        response = request_scheduler.write(get_worksheet(sheet_name).append_rows, payloads)
+        # The API reports where the rows landed, e.g. "WeeklyCosts!A42:L44"
+        updated_range = (response or {}).get('updates', {}).get('updatedRange', '')
+        match = re.search(r'![A-Z]+(\d+)', updated_range)
+        first_row = int(match.group(1)) if match else None
+        return [first_row + offset if first_row else None for offset in range(len(payloads))]
+    if kind == "update":
+        # Ranges apply in order, so a later write to the same cells wins as it
+        # would if sent separately; a repeated range is only sent the last time
+        updates = {}
+        for payload in payloads:
+            for update in payload:
+                updates.pop(update['range'], None)
+                updates[update['range']] = update
+        request_scheduler.write(get_worksheet(sheet_name).batch_update, list(updates.values()))
+    elif kind == "delete":
+        # Requests in one batch apply in order, just like separate calls
+        requests = [request for payload in payloads for request in payload]
+        request_scheduler.write(get_spreadsheet().batch_update, {"requests": requests})
+    else:
+        return [payload() for payload in payloads]
+    return [None] * len(payloads)
+
+
+def row_ranges(sheet_name, row_number, data):
+    """
+    batch_update ranges writing the given fields of one row, with fields in
+    adjacent columns sent as one range
+    """
+    header_map = get_header_map(sheet_name)
+    cells = sorted((header_map[key], value) for key, value in data.items() if key in header_map)
+    ranges = []
+    for col, value in cells:
+        if ranges and ranges[-1]['last'] == col - 1:
+            ranges[-1]['values'][0].append(value)
+            ranges[-1]['last'] = col
+        else:
+            ranges.append({'first': col, 'last': col, 'values': [[value]]})
+    return [{'range': rowcol_to_a1(row_number, r['first']) + ':' + rowcol_to_a1(row_number, r['last']),
+             'values': r['values']} for r in ranges]
+
+
+def update_row(sheet_name, row_number, data):
+    """Write only the given fields of one row, all in a single batch request"""
+    updates = row_ranges(sheet_name, row_number, data)
+    if updates:
+        submit_write(sheet_name, "update", updates)
+
+
+def append_row(sheet_name, row):
+    """
+    Append a row to a tab and wait until it is written. Returns the sheet
+    row number the row landed on, or None if unknown.
+    """
+    return submit_write(sheet_name, "append", row)
+
+
+def append_rows(sheet_name, rows):
+    """Append many rows to a tab in one request and wait until they are written"""
+    if not rows:
+        return
+    worksheet = get_worksheet(sheet_name)
+    submit_write(sheet_name, "call", lambda: request_scheduler.write(worksheet.append_rows, rows))
+
+
+def sheet_rows(sheet_name, df):
+    """DataFrame rows as lists in the tab's column order, missing cells blank"""
+    df = df.reindex(columns=get_headers(sheet_name)).astype(object)
+    return df.where(df.notna(), '').values.tolist()
+
+
+def changed_cells(sheet_name, row_numbers, df, version):
+    """
+    batch_update ranges writing the non-blank cells of DataFrame rows to the
+    given sheet rows, each row getting a new version
+    """
+    updates = []
+    for row_number, data in zip(row_numbers, df.to_dict('records')):
+        data = {key: value for key, value in data.items() if pd.notna(value)}
+        data[VERSION_COLUMN] = version
+        updates.extend(row_ranges(sheet_name, int(row_number), data))
+    return updates
+
+
+def delete_rows(sheet_name, row_numbers):
+    """
+    Delete rows by sheet row number in a single batch request.
+    Contiguous rows are removed as one range, working bottom-up so earlier
+    deletions don't shift the rows still to be deleted.
+    """
+    ranges = []
+    for row_number in sorted(set(row_numbers), reverse=True):
+        if ranges and ranges[-1][0] == row_number + 1:
+            ranges[-1][0] = row_number
+        else:
+            ranges.append([row_number, row_number])
+    if not ranges:
+        return
+    
+    sheet_id = get_worksheet(sheet_name).id
+    requests = [{
+        "deleteDimension": {
+            "range": {
+                "sheetId": sheet_id,
+                "dimension": "ROWS",
+                "startIndex": first - 1,
+                "endIndex": last
+            }
+        }
+    } for first, last in ranges]
+    with row_positions(sheet_name).exclusive():
+        submit_write(sheet_name, "delete", requests)
+
+
+def delete_matching_rows(sheet_name, column, value):
+    """
+    Delete every row whose `column` equals `value`, with no other write to a
+    row found by number landing between the lookup and the delete.
+    Returns the deleted sheet row numbers.
+    """
+    with row_positions(sheet_name).exclusive():
+        row_numbers = find_rows(sheet_name, column, value)
+        delete_rows(sheet_name, row_numbers)
+    return row_numbers
 
 
 def dataframe_to_sheet(worksheet, df):
     """Write entire DataFrame to worksheet (replaces all data)"""
-    worksheet.clear()
-    if not df.empty:
-        worksheet.update([df.columns.values.tolist()] + df.values.tolist())
+    def replace():
+        # clear and update run back to back on the tab's writer, so no other
+        # write can land between them
+        request_scheduler.write(worksheet.clear)
+        if len(df.columns):
+            request_scheduler.write(worksheet.update, [df.columns.values.tolist()] + df.values.tolist())
+    # Rows end up in new places
+    with row_positions(worksheet.title).exclusive():
+        submit_write(worksheet.title, "call", replace)
 
 
 # ============================================
 # CUSTOMER OPERATIONS
 # ============================================
-def get_all_customers():
-    """Get all active customers"""
-    ws = get_worksheet(SHEET_CUSTOMERS)
-    df = sheet_to_dataframe(ws)
-    if df.empty:
-        return []
+def get_customers_df(columns=None):
+    """Active customers as a DataFrame (only the given columns, if any)"""
+    df = read_sheet(SHEET_CUSTOMERS, columns=columns)
     # Filter active customers
     if 'is_active' in df.columns:
-        df = df[df['is_active'] != False]
-        df = df[df['is_active'] != 'False']
-        df = df[df['is_active'] != 'FALSE']
-    return df.to_dict('records')
+        df = df[df['is_active']]
+    return df
+
+
+def get_all_customers(columns=None):
+    """Get all active customers (only the given columns, if any)"""
+    return to_records(get_customers_df(columns))
 
 
 def get_customer_by_id(customer_id):
@@ -154,30 +1190,30 @@ def get_customer_by_id(customer_id):
 
 def create_customer(data):
     """Create new customer"""
-    ws = get_worksheet(SHEET_CUSTOMERS)
     data['id'] = generate_id()
     data['is_active'] = True
     data['created_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    data['updated_at'] = new_version()
     
     # Get headers and create row in correct order
-    headers = ws.row_values(1)
+    headers = get_headers(SHEET_CUSTOMERS)
     row = [data.get(h, '') for h in headers]
-    ws.append_row(row)
+    append_row(SHEET_CUSTOMERS, row)
+    mirror_write(sqlite_mirror.insert_row, SHEET_CUSTOMERS, data)
+    invalidate_cache(SHEET_CUSTOMERS)
     return data
 
 
-def update_customer(customer_id, data):
-    """Update existing customer"""
-    ws = get_worksheet(SHEET_CUSTOMERS)
-    df = sheet_to_dataframe(ws)
-    
-    # Find and update the row
-    mask = df['id'].astype(str) == str(customer_id)
-    if mask.any():
-        for key, value in data.items():
-            if key in df.columns:
-                df.loc[mask, key] = value
-        dataframe_to_sheet(ws, df)
+def update_customer(customer_id, data, expected_version=None):
+    """
+    Update existing customer. Pass the updated_at value the edit started
+    from as expected_version to get a ConflictError instead of overwriting
+    someone else's newer save.
+    """
+    locate = locate_by_id(SHEET_CUSTOMERS, customer_id, expected_version is not None)
+    if write_versioned(SHEET_CUSTOMERS, str(customer_id), locate, data, expected_version):
+        mirror_write(sqlite_mirror.update_rows, SHEET_CUSTOMERS, {'id': customer_id}, data)
+        invalidate_cache(SHEET_CUSTOMERS)
     return data
 
 
@@ -191,15 +1227,12 @@ def delete_customer(customer_id):
 # ============================================
 def get_all_vendors():
     """Get all active vendors"""
-    ws = get_worksheet(SHEET_VENDORS)
-    df = sheet_to_dataframe(ws)
+    df = read_sheet(SHEET_VENDORS)
     if df.empty:
         return []
     if 'is_active' in df.columns:
-        df = df[df['is_active'] != False]
-        df = df[df['is_active'] != 'False']
-        df = df[df['is_active'] != 'FALSE']
-    return df.to_dict('records')
+        df = df[df['is_active']]
+    return to_records(df)
 
 
 def get_vendor_by_id(vendor_id):
@@ -213,28 +1246,25 @@ def get_vendor_by_id(vendor_id):
 
 def create_vendor(data):
     """Create new vendor"""
-    ws = get_worksheet(SHEET_VENDORS)
     data['id'] = generate_id()
     data['is_active'] = True
     data['created_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    data['updated_at'] = new_version()
     
-    headers = ws.row_values(1)
+    headers = get_headers(SHEET_VENDORS)
     row = [data.get(h, '') for h in headers]
-    ws.append_row(row)
+    append_row(SHEET_VENDORS, row)
+    mirror_write(sqlite_mirror.insert_row, SHEET_VENDORS, data)
+    invalidate_cache(SHEET_VENDORS)
     return data
 
 
-def update_vendor(vendor_id, data):
-    """Update existing vendor"""
-    ws = get_worksheet(SHEET_VENDORS)
-    df = sheet_to_dataframe(ws)
-    
-    mask = df['id'].astype(str) == str(vendor_id)
-    if mask.any():
-        for key, value in data.items():
-            if key in df.columns:
-                df.loc[mask, key] = value
-        dataframe_to_sheet(ws, df)
+def update_vendor(vendor_id, data, expected_version=None):
+    """Update existing vendor (see update_customer for expected_version)"""
+    locate = locate_by_id(SHEET_VENDORS, vendor_id, expected_version is not None)
+    if write_versioned(SHEET_VENDORS, str(vendor_id), locate, data, expected_version):
+        mirror_write(sqlite_mirror.update_rows, SHEET_VENDORS, {'id': vendor_id}, data)
+        invalidate_cache(SHEET_VENDORS)
     return data
 
 
@@ -246,33 +1276,46 @@ def delete_vendor(vendor_id):
 # ============================================
 # JOB OPERATIONS
 # ============================================
+def lookup_table(df, columns):
+    """Index a tab's rows by str(id) for joins, keeping only the given columns"""
+    if df.empty or 'id' not in df.columns:
+        return pd.DataFrame(columns=columns, index=pd.Index([], dtype=object))
+    df = df.assign(id=df['id'].astype(str)).drop_duplicates('id', keep='last')
+    # Object columns keep e.g. integer job numbers intact next to missing matches
+    return df.set_index('id').reindex(columns=columns).astype(object)
+
+
+def get_jobs_df():
+    """
+    All jobs as a DataFrame with ids as text and the customer's name joined
+    in as customer_name (NaN when the customer is unknown or inactive)
+    """
+    df, customers = read_sheets([(SHEET_JOBS, None),
+                                 (SHEET_CUSTOMERS, ['id', 'name', 'is_active'])])
+    if df.empty:
+        return df
+    
+    for column, dtype in TAB_SCHEMAS[SHEET_JOBS].items():
+        if dtype == "float64" and column not in df.columns:
+            df[column] = 0.0
+    if 'customer_id' not in df.columns:
+        df['customer_id'] = ''
+    
+    if 'is_active' in customers.columns:
+        customers = customers[customers['is_active']]
+    names = lookup_table(customers, ['name']).rename(columns={'name': 'customer_name'})
+    return df.join(names, on='customer_id')
+
+
 def get_all_jobs():
     """Get all jobs with customer info"""
-    ws = get_worksheet(SHEET_JOBS)
-    df = sheet_to_dataframe(ws)
+    df = get_jobs_df()
     if df.empty:
         return []
     
-    # Get customers for lookup
-    customers = {str(c['id']): c for c in get_all_customers()}
-    
-    jobs = df.to_dict('records')
-    for job in jobs:
-        customer_id = str(job.get('customer_id', ''))
-        if customer_id in customers:
-            job['customers'] = {'name': customers[customer_id].get('name', '')}
-        else:
-            job['customers'] = None
-        
-        # Convert numeric fields
-        for field in ['contract_amount', 'pending_change_orders', 'approved_change_orders',
-                     'budget_insurance', 'budget_labor', 'budget_stamps', 'budget_material',
-                     'budget_subs_bond', 'budget_equipment', 'budget_man_days']:
-            try:
-                job[field] = float(job.get(field, 0) or 0)
-            except:
-                job[field] = 0
-    
+    jobs = to_records(df.drop(columns=['customer_name']))
+    for job, customer_name in zip(jobs, df['customer_name']):
+        job['customers'] = {'name': customer_name} if pd.notna(customer_name) else None
     return jobs
 
 
@@ -293,173 +1336,725 @@ def get_job_by_id(job_id):
 
 def create_job(data):
     """Create new job"""
-    ws = get_worksheet(SHEET_JOBS)
     data['id'] = generate_id()
     data['created_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    data['updated_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    data['updated_at'] = new_version()
     
-    headers = ws.row_values(1)
+    headers = get_headers(SHEET_JOBS)
     row = [data.get(h, '') for h in headers]
-    ws.append_row(row)
+    append_row(SHEET_JOBS, row)
+    mirror_write(sqlite_mirror.insert_row, SHEET_JOBS, data)
+    invalidate_cache(SHEET_JOBS)
     return data
 
 
-def update_job(job_id, data):
-    """Update existing job"""
-    ws = get_worksheet(SHEET_JOBS)
-    df = sheet_to_dataframe(ws)
-    
-    data['updated_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    mask = df['id'].astype(str) == str(job_id)
-    if mask.any():
-        for key, value in data.items():
-            if key in df.columns:
-                df.loc[mask, key] = value
-        dataframe_to_sheet(ws, df)
+def update_job(job_id, data, expected_version=None):
+    """Update existing job (see update_customer for expected_version)"""
+    locate = locate_by_id(SHEET_JOBS, job_id, expected_version is not None)
+    if write_versioned(SHEET_JOBS, str(job_id), locate, data, expected_version):
+        mirror_write(sqlite_mirror.update_rows, SHEET_JOBS, {'id': job_id}, data)
+        invalidate_cache(SHEET_JOBS)
     return data
 
 
 def delete_job(job_id):
     """Delete job"""
-    ws = get_worksheet(SHEET_JOBS)
-    df = sheet_to_dataframe(ws)
-    df = df[df['id'].astype(str) != str(job_id)]
-    dataframe_to_sheet(ws, df)
+    # Also delete related weekly costs (from every year) and their totals
+    deleted = {}
+    with _job_totals_lock:
+        delete_matching_rows(SHEET_JOBS, 'id', job_id)
+        mirror_write(sqlite_mirror.delete_rows, SHEET_JOBS, 'id', job_id)
+        for tab in get_cost_tabs():
+            deleted[tab] = sorted(delete_matching_rows(tab, 'job_id', job_id))
+            mirror_write(sqlite_mirror.delete_rows, tab, 'job_id', job_id)
+        delete_matching_rows(SHEET_JOB_TOTALS, 'job_id', job_id)
+        mirror_write(sqlite_mirror.delete_rows, SHEET_JOB_TOTALS, 'job_id', job_id)
+    invalidate_cache(SHEET_JOBS, *deleted, SHEET_JOB_TOTALS)
     
-    # Also delete related weekly costs
-    ws_costs = get_worksheet(SHEET_WEEKLY_COSTS)
-    df_costs = sheet_to_dataframe(ws_costs)
-    if not df_costs.empty:
-        df_costs = df_costs[df_costs['job_id'].astype(str) != str(job_id)]
-        dataframe_to_sheet(ws_costs, df_costs)
+    # Shift indexed rows up past the deleted ones
+    with _cost_index_lock:
+        for tab, index in _cost_index.items():
+            rows = deleted.get(tab, [])
+            index["rows"] = {
+                key: row_number - bisect.bisect_left(rows, row_number)
+                for key, row_number in index["rows"].items()
+                if key[0] != str(job_id)
+            }
 
 
 # ============================================
 # WEEKLY COST OPERATIONS
 # ============================================
+def concat_cost_frames(frames):
+    """Stack typed rows of several WeeklyCosts tabs into one typed DataFrame"""
+    frames = [df for df in frames if not df.empty] or list(frames[:1])
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    # Each tab has its own categories, which concat turns back into objects,
+    # and amounts a tab has no column for come back blank rather than 0
+    for column, dtype in TAB_SCHEMAS[SHEET_WEEKLY_COSTS].items():
+        if column not in df.columns:
+            continue
+        if dtype == "category" and df[column].dtype != "category":
+            df[column] = df[column].astype("category")
+        elif dtype == "float64":
+            df[column] = df[column].fillna(0)
+    return df
+
+
+def read_weekly_costs(columns=None, start_date=None, end_date=None):
+    """
+    WeeklyCosts rows (only the given columns, if any) of every tab that can
+    hold weeks in a date range - all tabs without one - as one typed
+    DataFrame, served from the shared cache. Rows of those tabs outside the
+    range are included.
+    """
+    tabs = cost_tabs_between(start_date, end_date)
+    return concat_cost_frames(read_sheets([(tab, columns) for tab in tabs]))
+
+
+def mirror_cost_rows(tabs, where, params):
+    """
+    Typed rows matching a SQL condition from the mirrored copies of some
+    WeeklyCosts tabs, or None when the mirror is off or a tab isn't in it yet
+    """
+    mirror_path = get_mirror_path()
+    if not mirror_path or not all(sqlite_mirror.has_table(mirror_path, tab) for tab in tabs):
+        return None
+    return concat_cost_frames([
+        apply_column_types(tab, sqlite_mirror.load_tab(mirror_path, tab, where, params))
+        for tab in tabs
+    ])
+
+
+def get_weekly_costs_frame(job_id):
+    """WeeklyCosts rows of a job as a typed DataFrame"""
+    df = mirror_cost_rows(get_cost_tabs(), '"job_id" = ?', [str(job_id)])
+    if df is None:
+        df = read_weekly_costs()
+    if df.empty or 'job_id' not in df.columns:
+        return df
+    return df[df['job_id'] == str(job_id)]
+
+
 def get_weekly_costs_by_job(job_id):
     """Get all weekly cost entries for a job"""
-    ws = get_worksheet(SHEET_WEEKLY_COSTS)
-    df = sheet_to_dataframe(ws)
+    df = get_weekly_costs_frame(job_id)
     if df.empty:
         return []
     
-    df = df[df['job_id'].astype(str) == str(job_id)]
-    
-    # Convert numeric fields
-    for col in ['insurance_actual', 'labor_actual', 'stamps_actual', 'material_actual',
-                'subs_bond_actual', 'equipment_actual', 'man_days_actual']:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-    
     # Sort by week_ending descending
     if not df.empty and 'week_ending' in df.columns:
         df = df.sort_values('week_ending', ascending=False)
     
-    return df.to_dict('records')
+    return to_records(df)
+
+
+def fetch_indexed_rows(sheet_name, start, end, job_id=None):
+    """
+    Download the rows of a WeeklyCosts tab whose index entry falls from
+    start to end (YYYY-MM-DD) and, if given, belongs to the job
+    """
+    for rebuild in (False, True):
+        wanted = {
+            key: row_number for key, row_number in get_cost_index(sheet_name, rebuild).items()
+            if start <= key[1] <= end and (job_id is None or key[0] == str(job_id))
+        }
+        df = apply_column_types(sheet_name, fetch_rows(sheet_name, wanted.values()))
+        if not wanted or df.empty or 'job_id' not in df.columns or 'week_ending' not in df.columns:
+            break
+        # Rows moved in Google Sheets leave the index pointing elsewhere
+        found = set(zip(df['job_id'].astype(str), date_text(df['week_ending'])))
+        if found.issuperset(wanted):
+            break
+    return df
+
+
+def get_weekly_costs_window(start_date, end_date, job_id=None):
+    """
+    WeeklyCosts rows with week_ending from start_date to end_date (inclusive),
+    optionally of one job, as a typed DataFrame. Only the tabs of the years
+    in the range are touched, and only those rows are read: with an indexed
+    query on the mirror, or from the sheet rows the cost index points at,
+    so recent-week screens don't grow with the history.
+    """
+    start, end = str(start_date), str(end_date)
+    tabs = cost_tabs_between(start, end)
+    where, params = '"week_ending" BETWEEN ? AND ?', [start, end]
+    if job_id is not None:
+        where, params = where + ' AND "job_id" = ?', params + [str(job_id)]
+    df = mirror_cost_rows(tabs, where, params)
+    if df is None:
+        ttl = float(get_setting("SHEETS_CACHE_TTL", 60))
+        frames = []
+        for tab in tabs:
+            cached = _fresh_from_cache((tab, None), ttl)
+            frames.append(cached.copy() if cached is not None
+                          else fetch_indexed_rows(tab, start, end, job_id))
+        df = concat_cost_frames(frames)
+    
+    if df.empty or 'week_ending' not in df.columns:
+        return df
+    keep = df['week_ending'].between(pd.Timestamp(start), pd.Timestamp(end))
+    if job_id is not None and 'job_id' in df.columns:
+        keep &= df['job_id'] == str(job_id)
+    return df[keep]
+
+
+def get_weekly_costs_between(start_date, end_date, job_id=None):
+    """Weekly cost entries with week_ending in a date range (inclusive), newest first"""
+    df = get_weekly_costs_window(start_date, end_date, job_id)
+    if df.empty:
+        return []
+    return to_records(df.sort_values('week_ending', ascending=False))
+
+
+def get_cost_index(sheet_name, rebuild=False):
+    """
+    Get the (job_id, week_ending) -> sheet row number index of a WeeklyCosts
+    tab. Built from one read of the tab, then maintained by the write functions.
+    """
+    ttl = float(get_setting("SHEETS_CACHE_TTL", 60))
+    with _cost_index_lock:
+        index = _cost_index.get(sheet_name)
+        if index is not None and not rebuild and time.monotonic() - index["built_at"] < ttl:
+            return index["rows"]
+    
+    built_at = time.monotonic()
+    key_columns = ['job_id', 'week_ending']
+    if rebuild or get_mirror_path():
+        # Row numbers have to come from the sheet itself; this is only a
+        # read, so the cached copy of the tab is left alone
+        df = fetch_columns(sheet_name, key_columns)
+    else:
+        df = read_sheet(sheet_name, columns=key_columns)
+    rows = {}
+    if not df.empty and 'job_id' in df.columns and 'week_ending' in df.columns:
+        # Rows follow the header, so DataFrame position 0 is sheet row 2
+        keys = zip(df['job_id'].astype(str), date_text(df['week_ending']))
+        for row_number, key in enumerate(keys, start=2):
+            rows.setdefault(key, row_number)
+    with _cost_index_lock:
+        _cost_index[sheet_name] = {"rows": rows, "built_at": built_at}
+    return rows
+
+
+def reset_cost_index():
+    """Drop the cost row indexes so the next lookups rebuild them"""
+    with _cost_index_lock:
+        _cost_index.clear()
+
+
+def cost_tabs_for_week(week_ending):
+    """The existing tabs that can hold a week's entries, the year's tab last"""
+    return [tab for tab in get_cost_tabs() if tab in (SHEET_WEEKLY_COSTS, cost_tab(week_ending))]
+
+
+def find_cost_row(job_id, week_ending):
+    """
+    Resolve a (job_id, week_ending) entry to (tab, row_number, row_values)
+    using the indexes of the tabs that can hold it, the year's tab first.
+    The row is read back to confirm it still holds that entry; if it was
+    moved in Google Sheets the tab's index is rebuilt once.
+    Returns (None, None, None) when there is no such entry.
+    """
+    key = (str(job_id), str(week_ending))
+    for tab in reversed(cost_tabs_for_week(week_ending)):
+        header_map = get_header_map(tab)
+        for rebuild in (False, True):
+            row_number = get_cost_index(tab, rebuild=rebuild).get(key)
+            if row_number is None:
+                break
+            values = request_scheduler.read(get_worksheet(tab).row_values, row_number)
+            found = tuple(str(values[header_map[col] - 1]) if len(values) >= header_map[col] else ''
+                          for col in ('job_id', 'week_ending'))
+            if found == key:
+                return tab, row_number, values
+    return None, None, None
 
 
 def get_weekly_cost_entry(job_id, week_ending):
     """Get specific weekly cost entry"""
-    costs = get_weekly_costs_by_job(job_id)
-    for c in costs:
-        if str(c.get('week_ending')) == str(week_ending):
-            return c
-    return None
+    df = mirror_cost_rows(cost_tabs_for_week(week_ending),
+                          '"job_id" = ? AND "week_ending" = ?', [str(job_id), str(week_ending)])
+    if df is None:
+        tab, row_number, values = find_cost_row(job_id, week_ending)
+        if row_number is None:
+            return None
+        df = apply_column_types(tab, pd.DataFrame([dict(zip(get_headers(tab), values))]))
+    if df.empty:
+        return None
+    # As in find_cost_row, the year's tab wins
+    return to_records(df.iloc[[-1]])[0]
 
 
-def upsert_weekly_cost(data):
-    """Insert or update weekly cost entry"""
-    ws = get_worksheet(SHEET_WEEKLY_COSTS)
-    df = sheet_to_dataframe(ws)
-    
+def upsert_weekly_cost(data, expected_version=None):
+    """
+    Insert or update weekly cost entry. New entries go to the tab of their
+    year, which is created on first use. Pass the updated_at value of the
+    entry the edit started from ('' if there was no entry yet) as
+    expected_version to get a ConflictError if someone else saved that week
+    in the meantime.
+    """
     job_id = str(data.get('job_id', ''))
     week_ending = str(data.get('week_ending', ''))
+    key = f"{job_id}/{week_ending}"
+    changes = {key: value for key, value in data.items() if key != 'id'}
     
-    if df.empty:
-        # First entry - just append
-        data['id'] = generate_id()
-        data['created_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        headers = ws.row_values(1)
-        row = [data.get(h, '') for h in headers]
-        ws.append_row(row)
-    else:
-        # Check if entry exists
-        mask = (df['job_id'].astype(str) == job_id) & (df['week_ending'].astype(str) == week_ending)
+    with row_lock(SHEET_WEEKLY_COSTS, key), _job_totals_lock:
+        tab, row_number, values = find_cost_row(job_id, week_ending)
+        tab = tab or cost_tab(week_ending)
+        found = (row_number, values)
+        previous = dict(zip(get_headers(tab), values or []))
         
-        if mask.any():
-            # Update existing
-            for key, value in data.items():
-                if key in df.columns and key != 'id':
-                    df.loc[mask, key] = value
-            dataframe_to_sheet(ws, df)
+        # Update the entry if it exists
+        row_number = write_versioned(tab, key, lambda: found, changes, expected_version)
+        if row_number:
+            data[VERSION_COLUMN] = changes[VERSION_COLUMN]
+            mirror_write(sqlite_mirror.update_rows, tab,
+                         {'job_id': job_id, 'week_ending': week_ending}, changes)
         else:
+            if expected_version:
+                # The entry being edited was deleted
+                invalidate_cache(tab)
+                raise ConflictError(tab, key, expected_version, '')
             # Insert new
             data['id'] = generate_id()
             data['created_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            headers = ws.row_values(1)
+            data[VERSION_COLUMN] = new_version()
+            headers = get_headers(tab)
             row = [data.get(h, '') for h in headers]
-            ws.append_row(row)
+            row_number = append_row(tab, row)
+            mirror_write(sqlite_mirror.insert_row, tab, data)
+            
+            with _cost_index_lock:
+                index = _cost_index.get(tab)
+                if row_number and index is not None:
+                    index["rows"][(job_id, week_ending)] = row_number
+                else:
+                    _cost_index.pop(tab, None)
+        
+        # Move the job's running totals by what this save changed
+        old = cost_amounts(previous)
+        new = cost_amounts({**previous, **changes})
+        add_to_job_totals({job_id: {category: new[category] - old[category] for category in new}})
     
+    invalidate_cache(tab)
     return data
 
 
-def get_job_cost_totals(job_id):
-    """Get total costs for a specific job"""
-    costs = get_weekly_costs_by_job(job_id)
+def save_weekly_costs(rows, expected_versions=None):
+    """
+    Insert or update many weekly cost entries at once. rows is a DataFrame
+    with job_id, week_ending (YYYY-MM-DD) and any other WeeklyCosts columns;
+    NaN cells keep what an existing entry has. The tabs involved are read
+    in one request, then each gets one batch update for its existing
+    entries and one append for its new ones, and JobTotals moves once.
+    expected_versions works as in upsert_weekly_costs.
+    Returns {"inserted": n, "updated": n}.
+    """
+    if rows.empty:
+        return {"inserted": 0, "updated": 0}
+    keys = ['job_id', 'week_ending']
+    amount_columns = list(COST_CATEGORIES.values())
+    columns = [column for column in rows.columns if column in TAB_SCHEMAS[SHEET_WEEKLY_COSTS]
+               and column not in ('id', 'created_at', VERSION_COLUMN)]
+    rows = rows[columns].reset_index(drop=True).astype({'job_id': str, 'week_ending': str})
+    rows['tab'] = SHEET_WEEKLY_COSTS + "_" + rows['week_ending'].str[:4]
     
-    if not costs:
-        return {
-            "insurance": 0, "labor": 0, "stamps": 0,
-            "material": 0, "subs_bond": 0, "equipment": 0,
-            "man_days": 0, "total": 0
-        }
+    with _job_totals_lock:
+        for tab in rows['tab'].unique():
+            # Creates the year's tab on first use
+            get_worksheet(tab)
+        tabs = [tab for tab in get_cost_tabs() if tab == SHEET_WEEKLY_COSTS or tab in set(rows['tab'])]
+        for tab in tabs:
+            for column in columns + [VERSION_COLUMN]:
+                ensure_column(tab, column)
+        
+        # Where each key is stored now, and its amounts: the first row of a
+        # key in a tab, and the year's tab over the older one (as find_cost_row)
+        stored = []
+        stored_columns = tuple(keys + amount_columns + [VERSION_COLUMN])
+        for (tab, _), df in fetch_tabs([(tab, stored_columns) for tab in tabs]).items():
+            if df.empty or 'job_id' not in df.columns or 'week_ending' not in df.columns:
+                continue
+            df = apply_column_types(tab, df)
+            df = df.assign(job_id=df['job_id'].astype(str), week_ending=date_text(df['week_ending']),
+                           stored_tab=tab, row_number=range(2, len(df) + 2))
+            stored.append(df.drop_duplicates(keys))
+        existing = pd.concat(stored).drop_duplicates(keys, keep='last') if stored else pd.DataFrame()
+        existing = existing.reindex(columns=list(stored_columns) + ['stored_tab', 'row_number'])
+        existing = existing.rename(columns={col: f"{col}_stored" for col in stored_columns if col not in keys})
+        merged = rows.merge(existing, on=keys, how='left')
+        found = merged['row_number'].notna()
+        
+        if expected_versions is not None:
+            current = merged[f"{VERSION_COLUMN}_stored"].fillna('').astype(str)
+            for job_id, week_ending, tab, version in zip(merged['job_id'], merged['week_ending'],
+                                                         merged['tab'], current):
+                expected = expected_versions.get((job_id, week_ending))
+                if expected is not None and str(expected) != version:
+                    # Nothing is written, and the cached copies are stale too
+                    invalidate_cache(*tabs)
+                    raise ConflictError(tab, f"{job_id}/{week_ending}", expected, version)
+        
+        # Move each job's totals by what the batch changed
+        old = pd.DataFrame({col: merged[f"{col}_stored"] for col in amount_columns}).fillna(0.0)
+        new = pd.DataFrame({col: merged[col].fillna(old[col]) if col in merged.columns else old[col]
+                            for col in amount_columns})
+        delta = (new - old).groupby(merged['job_id']).sum()
+        delta.columns = list(COST_CATEGORIES)
+        
+        version = new_version()
+        for tab, group in merged[found].groupby('stored_tab'):
+            values = group[[column for column in columns if column not in keys]]
+            submit_write(tab, "update", changed_cells(tab, group['row_number'], values, version))
+        
+        added = merged.loc[~found, columns + ['tab']]
+        added = added.assign(id=generate_ids(len(added)),
+                             created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        added[VERSION_COLUMN] = version
+        for tab, group in added.groupby('tab'):
+            append_rows(tab, sheet_rows(tab, group))
+        
+        add_to_job_totals(delta.to_dict('index'))
     
-    totals = {
-        "insurance": sum(float(c.get("insurance_actual", 0) or 0) for c in costs),
-        "labor": sum(float(c.get("labor_actual", 0) or 0) for c in costs),
-        "stamps": sum(float(c.get("stamps_actual", 0) or 0) for c in costs),
-        "material": sum(float(c.get("material_actual", 0) or 0) for c in costs),
-        "subs_bond": sum(float(c.get("subs_bond_actual", 0) or 0) for c in costs),
-        "equipment": sum(float(c.get("equipment_actual", 0) or 0) for c in costs),
-        "man_days": sum(int(float(c.get("man_days_actual", 0) or 0)) for c in costs),
+    written = sorted(set(merged.loc[found, 'stored_tab']) | set(added['tab']))
+    with _cost_index_lock:
+        # Appended rows' numbers aren't known - rebuild those indexes
+        for tab in written:
+            _cost_index.pop(tab, None)
+    invalidate_cache(*written)
+    if get_mirror_path():
+        pull_to_mirror(*written)
+    return {"inserted": len(added), "updated": int(found.sum())}
+
+
+def upsert_weekly_costs(entries, expected_versions=None):
+    """
+    upsert_weekly_cost for many entries (dicts) in one batch, e.g. a week
+    of every job; fields an entry leaves out keep their stored values.
+    expected_versions maps (job_id, week_ending) to the updated_at value the
+    edit of that entry started from ('' if there was none): if any entry
+    was saved by someone else since, ConflictError is raised for it and
+    nothing is written. Returns {"inserted": n, "updated": n}.
+    """
+    rows = pd.DataFrame(list(entries))
+    if not rows.empty:
+        rows = rows.astype({'job_id': str, 'week_ending': str})
+    expected_versions = ({(str(job_id), str(week_ending)): version
+                          for (job_id, week_ending), version in expected_versions.items()}
+                         if expected_versions is not None else None)
+    return save_weekly_costs(rows, expected_versions)
+
+
+def split_weekly_costs_by_year():
+    """
+    Move the rows of a WeeklyCosts tab from before costs were split by year
+    into the tab of each row's year. The tab is deleted once it is empty;
+    rows without a valid week_ending are left in it. Returns the number of
+    rows moved.
+    """
+    if SHEET_WEEKLY_COSTS not in get_cost_tabs():
+        return 0
+    with _job_totals_lock:
+        # Cells as stored, so IDs stay text and amounts stay numbers
+        response = request_scheduler.read(
+            get_spreadsheet().values_get, tab_range(SHEET_WEEKLY_COSTS),
+            params={'valueRenderOption': 'UNFORMATTED_VALUE',
+                    'dateTimeRenderOption': 'FORMATTED_STRING'})
+        values = response.get('values', [])
+        headers = values[0] if values else []
+        rows = [dict(zip(headers, row)) for row in values[1:]]
+        years = pd.to_datetime(pd.Series([str(row.get('week_ending', '')) for row in rows]),
+                               errors='coerce', format='mixed').dt.year
+        
+        kept = []
+        by_tab = defaultdict(list)
+        for row, year in zip(rows, years):
+            if pd.isna(year):
+                kept.append([row.get(h, '') for h in headers])
+            else:
+                by_tab[f"{SHEET_WEEKLY_COSTS}_{int(year)}"].append(row)
+        for tab, tab_rows in by_tab.items():
+            for column in headers:
+                if column:
+                    ensure_column(tab, column)
+            tab_headers = get_headers(tab)
+            append_rows(tab, [[row.get(h, '') for h in tab_headers] for row in tab_rows])
+        
+        # Only after every row is safely in its year's tab
+        legacy = get_worksheet(SHEET_WEEKLY_COSTS)
+        
+        def replace():
+            request_scheduler.write(legacy.clear)
+            request_scheduler.write(legacy.update, [headers] + kept)
+        
+        def remove():
+            # A header-only tab would still be read with every other cost tab
+            request_scheduler.write(get_spreadsheet().del_worksheet, legacy)
+        submit_write(SHEET_WEEKLY_COSTS, "call", replace if kept else remove)
+        if not kept:
+            reset_handles(SHEET_WEEKLY_COSTS)
+    
+    reset_cost_index()
+    invalidate_cache(SHEET_WEEKLY_COSTS, *by_tab)
+    if get_mirror_path():
+        pull_to_mirror(*([SHEET_WEEKLY_COSTS] if kept else []), *by_tab)
+    return len(rows) - len(kept)
+
+
+def empty_cost_totals():
+    """Zeroed cost totals for a job with no weekly entries"""
+    return {
+        "insurance": 0, "labor": 0, "stamps": 0,
+        "material": 0, "subs_bond": 0, "equipment": 0,
+        "man_days": 0, "total": 0
     }
-    totals["total"] = totals["insurance"] + totals["labor"] + totals["stamps"] + \
-                      totals["material"] + totals["subs_bond"] + totals["equipment"]
-    return totals
+
+
+def group_cost_totals(df):
+    """
+    Per-job cost totals of typed WeeklyCosts rows, as a DataFrame indexed
+    by str(job_id) with one column per category plus total
+    """
+    amounts = pd.DataFrame({'job_id': df['job_id'] if 'job_id' in df.columns else []})
+    for key, col in COST_CATEGORIES.items():
+        amounts[key] = df[col] if col in df.columns else 0.0
+    # Man days are whole numbers per week
+    amounts['man_days'] = amounts['man_days'].astype(int)
+    
+    grouped = amounts.groupby('job_id', observed=True).sum()
+    grouped.index = grouped.index.astype(str)
+    grouped['total'] = grouped[["insurance", "labor", "stamps",
+                                "material", "subs_bond", "equipment"]].sum(axis=1)
+    return grouped
+
+
+def totals_by_job(totals):
+    """
+    Per-job totals (a DataFrame indexed by str(job_id)) as a defaultdict;
+    jobs without entries get zeroed totals.
+    """
+    all_totals = defaultdict(empty_cost_totals)
+    for job_id, job_totals in totals.to_dict('index').items():
+        job_totals['man_days'] = int(job_totals['man_days'])
+        all_totals[job_id] = job_totals
+    return all_totals
+
+
+def cost_amounts(entry):
+    """Category amounts of a weekly cost entry (a dict of its cells), blanks as 0"""
+    amounts = {}
+    for category, col in COST_CATEGORIES.items():
+        try:
+            amounts[category] = float(entry.get(col) or 0)
+        except (TypeError, ValueError):
+            amounts[category] = 0.0
+    return amounts
+
+
+def add_to_job_totals(deltas):
+    """
+    Add per-category amounts to jobs' JobTotals rows ({job_id: {category:
+    amount}}), creating rows as needed, with one read of the table, one
+    batch update and one append. Call it after the cost rows are written:
+    while the table is still empty it is built from every WeeklyCosts tab
+    instead.
+    """
+    deltas = {str(job_id): delta for job_id, delta in deltas.items() if any(delta.values())}
+    if not deltas:
+        return
+    with _job_totals_lock:
+        # The table has a row per job, so reading it whole is one small request
+        current = fetch_sheet(SHEET_JOB_TOTALS)
+        if current.empty:
+            # First cost write since an upgrade or Initialize Sheets: deltas
+            # alone would leave out the costs already in the sheet
+            rebuild_job_totals()
+            return
+        # The last row of a job wins, as when the table is read
+        positions = ({value: position for position, value in enumerate(current['job_id'].astype(str))}
+                     if 'job_id' in current.columns else {})
+        version = new_version()
+        updated, added = {}, []
+        for job_id, delta in deltas.items():
+            stored = current.iloc[positions[job_id]].to_dict() if job_id in positions else {}
+            totals = cost_amounts({col: stored.get(category) for category, col in COST_CATEGORIES.items()})
+            for category, amount in delta.items():
+                totals[category] = round(totals[category] + amount, 2)
+            totals['total'] = round(sum(amount for category, amount in totals.items()
+                                        if category != 'man_days'), 2)
+            totals[VERSION_COLUMN] = version
+            if job_id in positions:
+                updated[job_id] = totals
+            else:
+                added.append({**totals, 'job_id': job_id})
+        
+        # DataFrame position 0 is sheet row 2
+        updates = [update for job_id, totals in updated.items()
+                   for update in row_ranges(SHEET_JOB_TOTALS, positions[job_id] + 2, totals)]
+        if updates:
+            submit_write(SHEET_JOB_TOTALS, "update", updates)
+        headers = get_headers(SHEET_JOB_TOTALS)
+        append_rows(SHEET_JOB_TOTALS, [[totals.get(h, '') for h in headers] for totals in added])
+        
+        for job_id, totals in updated.items():
+            mirror_write(sqlite_mirror.update_rows, SHEET_JOB_TOTALS, {'job_id': job_id}, totals)
+        for totals in added:
+            mirror_write(sqlite_mirror.insert_row, SHEET_JOB_TOTALS, totals)
+    invalidate_cache(SHEET_JOB_TOTALS)
+
+
+def rebuild_job_totals():
+    """
+    Recompute JobTotals from every WeeklyCosts tab, e.g. after costs
+    were edited directly in Google Sheets. Returns the number of jobs.
+    """
+    columns = ('job_id',) + tuple(COST_CATEGORIES.values())
+    with _job_totals_lock:
+        frames = fetch_tabs([(tab, columns) for tab in get_cost_tabs()])
+        costs = concat_cost_frames([apply_column_types(tab, df) for (tab, _), df in frames.items()])
+        totals = group_cost_totals(costs).round(2)
+        totals[VERSION_COLUMN] = new_version()
+        df = totals.rename_axis('job_id').reset_index().reindex(
+            columns=list(TAB_SCHEMAS[SHEET_JOB_TOTALS]))
+        dataframe_to_sheet(get_worksheet(SHEET_JOB_TOTALS), df)
+        remember_headers(SHEET_JOB_TOTALS, list(df.columns))
+        mirror_write(sqlite_mirror.store_tab, SHEET_JOB_TOTALS, df)
+    invalidate_cache(SHEET_JOB_TOTALS)
+    return len(df)
+
+
+def get_job_cost_totals_df():
+    """
+    Cost totals for every job as a DataFrame indexed by str(job_id), read
+    from JobTotals (built from WeeklyCosts first if that tab is new)
+    """
+    df = read_sheet(SHEET_JOB_TOTALS)
+    if df.empty and not read_weekly_costs(['job_id']).empty:
+        rebuild_job_totals()
+        df = read_sheet(SHEET_JOB_TOTALS)
+    
+    columns = list(COST_CATEGORIES) + ['total']
+    if df.empty or 'job_id' not in df.columns:
+        return pd.DataFrame(0.0, columns=columns, index=pd.Index([], dtype=object, name='job_id'))
+    df = df.assign(job_id=df['job_id'].astype(str)).drop_duplicates('job_id', keep='last')
+    df = df.set_index('job_id').reindex(columns=columns).fillna(0.0)
+    df['man_days'] = df['man_days'].astype(int)
+    return df
+
+
+def get_job_cost_totals(job_id):
+    """Get total costs for a specific job"""
+    return totals_by_job(get_job_cost_totals_df())[str(job_id)]
+
+
+def get_all_job_cost_totals():
+    """
+    Get cost totals for every job from the JobTotals table.
+    Returns a defaultdict keyed by str(job_id); jobs without entries get zeroed totals.
+    """
+    return totals_by_job(get_job_cost_totals_df())
+
+
+def get_weekly_costs_df():
+    """
+    All weekly costs as a DataFrame with job_id as text and the job's
+    job_number and job_name joined in (NaN when the job is unknown)
+    """
+    *frames, jobs = read_sheets([(tab, None) for tab in get_cost_tabs()] +
+                                [(SHEET_JOBS, ['id', 'job_number', 'job_name'])])
+    df = concat_cost_frames(frames)
+    if df.empty:
+        return df
+    
+    if 'job_id' not in df.columns:
+        df['job_id'] = ''
+    return df.join(lookup_table(jobs, ['job_number', 'job_name']), on='job_id')
 
 
 def get_all_weekly_costs():
     """Get all weekly costs with job info"""
-    ws = get_worksheet(SHEET_WEEKLY_COSTS)
-    df = sheet_to_dataframe(ws)
+    df = get_weekly_costs_df()
     if df.empty:
         return []
     
-    # Get jobs for lookup
-    jobs = {str(j['id']): j for j in get_all_jobs()}
+    known = df['job_number'].notna()
+    costs = to_records(df.drop(columns=['job_number', 'job_name']))
+    for cost, is_known, job_number, job_name in zip(costs, known, df['job_number'], df['job_name']):
+        cost['jobs'] = {'job_number': job_number, 'job_name': job_name} if is_known else None
+    return costs
+
+
+# ============================================
+# BULK IMPORT
+# ============================================
+def import_weekly_costs(chunks):
+    """
+    Import weekly cost entries from a file streamed by bulk_import.read_chunks.
+    Each chunk is checked as it is read, then the good rows are saved with
+    save_weekly_costs. Returns {"inserted", "updated", "errors"}, errors
+    listing the file rows skipped and why.
+    """
+    jobs = read_sheet(SHEET_JOBS, columns=['id', 'job_number'])
+    rows, errors = bulk_import.collect(chunks, bulk_import.coerce_costs, ['job_id', 'week_ending'], jobs)
+    return {**save_weekly_costs(rows), "errors": errors}
+
+
+def import_jobs(chunks):
+    """
+    Import jobs from a file streamed by bulk_import.read_chunks, matched to
+    existing jobs by job_number. Blank cells keep an existing job's values;
+    new jobs are active unless the file gives a status. Existing jobs are
+    updated in one batch request and new ones appended in another.
+    Returns {"inserted", "updated", "errors"} as import_weekly_costs does.
+    """
+    customers = read_sheet(SHEET_CUSTOMERS, columns=['id', 'name', 'is_active'])
+    if 'is_active' in customers.columns:
+        customers = customers[customers['is_active']]
+    # The file is read and checked before any lock is taken, against the
+    # cached jobs; which of them still exist is settled below
+    jobs = read_sheet(SHEET_JOBS, columns=['id', 'job_number'])
+    rows, errors = bulk_import.collect(chunks, bulk_import.coerce_jobs, ['job_number'], jobs, customers)
+    if rows.empty:
+        return {"inserted": 0, "updated": 0, "errors": errors}
+    for column in list(rows.columns) + [VERSION_COLUMN]:
+        ensure_column(SHEET_JOBS, column)
     
-    costs = df.to_dict('records')
-    for cost in costs:
-        job_id = str(cost.get('job_id', ''))
-        if job_id in jobs:
-            cost['jobs'] = {
-                'job_number': jobs[job_id].get('job_number', ''),
-                'job_name': jobs[job_id].get('job_name', '')
-            }
-        else:
-            cost['jobs'] = None
+    # The rows stay where they were read until the update has landed
+    with row_positions(SHEET_JOBS).shared():
+        # Row numbers have to come from the sheet itself
+        jobs = fetch_columns(SHEET_JOBS, ['id', 'job_number'])
+        positions = {}
+        if 'job_number' in jobs.columns:
+            for position, number in enumerate(jobs['job_number'].astype(str)):
+                # The first row of a job number, as find_row
+                positions.setdefault(number, position)
+        found = rows['job_number'].isin(positions)
         
-        # Convert numeric fields
-        for field in ['insurance_actual', 'labor_actual', 'stamps_actual', 'material_actual',
-                     'subs_bond_actual', 'equipment_actual', 'man_days_actual']:
-            try:
-                cost[field] = float(cost.get(field, 0) or 0)
-            except:
-                cost[field] = 0
+        version = new_version()
+        # DataFrame position 0 is sheet row 2
+        row_numbers = rows.loc[found, 'job_number'].map(positions) + 2
+        updates = changed_cells(SHEET_JOBS, row_numbers, rows[found].drop(columns=['job_number']), version)
+        if updates:
+            submit_write(SHEET_JOBS, "update", updates)
     
-    return costs
+    # A job deleted since the cached copy was read is new again, so needs a name
+    nameless = ~found & (rows['job_name'].isna() if 'job_name' in rows.columns else True)
+    errors = sorted(errors + [{"row": position + 2, "error": "job_name is missing for a new job"}
+                              for position in rows.index[nameless]], key=lambda error: error["row"])
+    added = rows[~found & ~nameless]
+    added = added.assign(id=generate_ids(len(added)), created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    added['status'] = added['status'].fillna('active') if 'status' in added.columns else 'active'
+    added[VERSION_COLUMN] = version
+    append_rows(SHEET_JOBS, sheet_rows(SHEET_JOBS, added))
+    
+    invalidate_cache(SHEET_JOBS)
+    if get_mirror_path():
+        pull_to_mirror(SHEET_JOBS)
+    return {"inserted": len(added), "updated": int(found.sum()), "errors": errors}
 
 
 # ============================================
@@ -467,6 +2062,9 @@ def get_all_weekly_costs():
 # ============================================
 def initialize_sheets():
     """Initialize all worksheets with headers"""
-    for sheet_name in [SHEET_CUSTOMERS, SHEET_VENDORS, SHEET_JOBS, SHEET_WEEKLY_COSTS]:
+    reset_handles()
+    for sheet_name in ALL_SHEETS:
         get_worksheet(sheet_name)
+    # This year's weekly costs tab; other years' are added as entries arrive
+    get_worksheet(cost_tab(datetime.now().date()))
     return True
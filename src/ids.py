@@ -0,0 +1,65 @@
+"""
+ID Generation
+Row IDs are digit strings that sort by creation time: the local timestamp to
+the microsecond (the format IDs have always started with), then a node number
+for this process, then a per-process sequence. Two IDs minted in the same
+microsecond differ in the sequence, and two workers in the node number.
+Within a process IDs always increase, even if the clock steps backwards.
+"""
+import os
+import secrets
+import threading
+from datetime import datetime, timedelta
+
+NODE_DIGITS = 4
+SEQUENCE_DIGITS = 4
+
+# The clock IDs are stamped with
+_clock = datetime.now
+
+_state = {}
+
+
+def _reset():
+    """Pick this process's node number and restart its sequence"""
+    node = os.getenv("ID_NODE")
+    _state["node"] = int(node) % 10 ** NODE_DIGITS if node else secrets.randbelow(10 ** NODE_DIGITS)
+    _state["last"] = None
+    _state["sequence"] = 0
+    _state["lock"] = threading.Lock()
+
+
+_reset()
+if hasattr(os, "register_at_fork"):
+    # A forked worker must not reuse its parent's node and sequence
+    os.register_at_fork(after_in_child=_reset)
+
+
+def _next_stamp():
+    """
+    The (timestamp, sequence) of the next ID: the clock's time if it moved
+    on, else the last timestamp with the next sequence number, or a
+    microsecond past it once the sequence runs out
+    """
+    with _state["lock"]:
+        now, last = _clock(), _state["last"]
+        if last is None or now > last:
+            _state["last"], _state["sequence"] = now, 0
+        elif _state["sequence"] < 10 ** SEQUENCE_DIGITS - 1:
+            _state["sequence"] += 1
+        else:
+            _state["last"], _state["sequence"] = last + timedelta(microseconds=1), 0
+        return _state["last"], _state["sequence"]
+
+
+def generate_id():
+    """Generate a unique, time-sortable ID"""
+    stamp, sequence = _next_stamp()
+    return (stamp.strftime("%Y%m%d%H%M%S%f")
+            + str(_state["node"]).zfill(NODE_DIGITS)
+            + str(sequence).zfill(SEQUENCE_DIGITS))
+
+
+def generate_ids(count):
+    """Generate count unique IDs for a batch insert, in sortable order"""
+    return [generate_id() for _ in range(count)]
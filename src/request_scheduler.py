@@ -0,0 +1,128 @@
+"""
+Google Sheets Request Scheduler
+Every Sheets API call goes through here. Reads and writes each draw from a
+token bucket sized to the per-minute quota, page (interactive) requests are
+served ahead of background (bulk) work, and quota errors are retried with
+exponential backoff and jitter instead of failing the page.
+"""
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+import gspread
+
+READ = "read"
+WRITE = "write"
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+# HTTP statuses worth retrying: quota exceeded and transient server errors.
+# A write is only retried when it was rejected for quota: after a server error
+# it may have been applied, and resending an append would add its rows twice
+# or a row delete would remove the rows that moved into its place.
+RETRY_STATUSES = {
+    READ: {429, 500, 502, 503},
+    WRITE: {429}
+}
+
+_limits = {
+    READ: 60,          # requests per minute
+    WRITE: 60,
+    "max_retries": 5,
+    "max_backoff": 32  # seconds
+}
+_buckets = {}
+_waiting_interactive = defaultdict(int)
+_condition = threading.Condition()
+_context = threading.local()
+
+
+def configure(reads_per_minute=None, writes_per_minute=None, max_retries=None):
+    """Set the request budgets (defaults match the Sheets per-user quota)"""
+    with _condition:
+        if reads_per_minute:
+            _limits[READ] = float(reads_per_minute)
+        if writes_per_minute:
+            _limits[WRITE] = float(writes_per_minute)
+        if max_retries is not None:
+            _limits["max_retries"] = int(max_retries)
+        _buckets.clear()
+        _condition.notify_all()
+
+
+@contextmanager
+def bulk():
+    """Run the calls made inside this block at background priority"""
+    previous = getattr(_context, "priority", INTERACTIVE)
+    _context.priority = BULK
+    try:
+        yield
+    finally:
+        _context.priority = previous
+
+
+def _refill(kind):
+    """Top up a bucket for the time elapsed (caller holds _condition)"""
+    now = time.monotonic()
+    capacity = _limits[kind]
+    bucket = _buckets.setdefault(kind, {"tokens": capacity, "updated": now})
+    bucket["tokens"] = min(capacity, bucket["tokens"] + (now - bucket["updated"]) * capacity / 60)
+    bucket["updated"] = now
+    return bucket
+
+
+def _acquire(kind, priority):
+    """Wait for a token; bulk callers also wait while interactive ones are queued"""
+    with _condition:
+        if priority == INTERACTIVE:
+            _waiting_interactive[kind] += 1
+        try:
+            while True:
+                bucket = _refill(kind)
+                if bucket["tokens"] >= 1 and (priority == INTERACTIVE or not _waiting_interactive[kind]):
+                    bucket["tokens"] -= 1
+                    return
+                shortfall = max(1 - bucket["tokens"], 0)
+                _condition.wait(timeout=max(shortfall * 60 / _limits[kind], 0.05))
+        finally:
+            if priority == INTERACTIVE:
+                _waiting_interactive[kind] -= 1
+                _condition.notify_all()
+
+
+def _status(error):
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) or getattr(error, "code", None)
+
+
+def run(kind, fn, *args, **kwargs):
+    """
+    Call fn once a request token is available, retrying quota errors (and,
+    for reads, transient server errors)
+    """
+    priority = getattr(_context, "priority", INTERACTIVE)
+    for attempt in range(_limits["max_retries"] + 1):
+        _acquire(kind, priority)
+        try:
+            return fn(*args, **kwargs)
+        except gspread.exceptions.APIError as e:
+            if _status(e) not in RETRY_STATUSES[kind] or attempt == _limits["max_retries"]:
+                raise
+            if _status(e) == 429:
+                # The quota is spent for everyone - empty the bucket so other
+                # callers slow down too
+                with _condition:
+                    _refill(kind)["tokens"] = 0
+            time.sleep(min(2 ** attempt, _limits["max_backoff"]) + random.random())
+
+
+def read(fn, *args, **kwargs):
+    """Run a read request through the scheduler"""
+    return run(READ, fn, *args, **kwargs)
+
+
+def write(fn, *args, **kwargs):
+    """Run a write request through the scheduler"""
+    return run(WRITE, fn, *args, **kwargs)
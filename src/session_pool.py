@@ -0,0 +1,103 @@
+"""
+Google Sheets HTTP Session Pool
+The gspread client is shared by every Streamlit session thread, but its HTTP
+requests are spread over a bounded pool of authorized sessions: each request
+checks one out and returns it when the response is read, so concurrent page
+loads don't queue behind one connection or use a requests.Session from two
+threads at once. Sessions keep their connections alive between requests and
+ask for gzip-compressed responses.
+"""
+import queue
+import threading
+from contextlib import contextmanager
+from google.auth.transport.requests import AuthorizedSession
+from requests.adapters import HTTPAdapter
+
+# Sessions (so connections to Google) opened at most
+POOL_SIZE = 4
+
+# Google APIs only compress responses for clients whose User-Agent has "(gzip)"
+USER_AGENT = "elite-wall-sheets (gzip)"
+
+
+class SessionPool:
+    """
+    A bounded set of AuthorizedSessions that gspread uses as its session:
+    pass it as gspread.Client(auth=credentials, session=pool).
+    """
+
+    def __init__(self, credentials, size=POOL_SIZE):
+        self.credentials = credentials
+        self.size = max(int(size), 1)
+        # Last in, first out: the most recently used session's connection is
+        # the one least likely to have been closed by the server
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        """A new authorized session holding one keep-alive connection"""
+        session = AuthorizedSession(self.credentials)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount("https://", adapter)
+        session.headers.update({"Accept-Encoding": "gzip", "User-Agent": USER_AGENT})
+        return session
+
+    @contextmanager
+    def checkout(self):
+        """Borrow a session, opening one if none is idle and the pool isn't full"""
+        try:
+            session = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    session = self._open()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                session = self._idle.get()
+        try:
+            yield session
+        finally:
+            self._idle.put(session)
+
+    def request(self, method, url, **kwargs):
+        """Send one request on a pooled session (what gspread 6 calls)"""
+        with self.checkout() as session:
+            # The body is read before the session goes back to the pool
+            response = session.request(method, url, **kwargs)
+            response.content
+            return response
+
+    # gspread 5.x calls session.get(url, ...), session.post(...) and so on
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        """Close the idle sessions' connections"""
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                self._opened -= 1
+            session.close()
@@ -0,0 +1,164 @@
+"""
+Local SQLite Mirror
+Keeps a copy of each Google Sheets tab in a local SQLite file so reads
+don't have to go over the network. The sheet stays the system of record:
+google_sheets.py writes to the sheet first, then applies the same change here,
+and periodically pulls every tab to pick up edits made in Google Sheets.
+"""
+import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+import pandas as pd
+
+# Columns used as lookup keys - always stored as text so "1" and 1 match
+KEY_COLUMNS = ["id", "job_id", "customer_id", "week_ending"]
+
+# Indexes created when the tab has the columns
+INDEXES = [["id"], ["job_id"], ["week_ending"], ["job_id", "week_ending"]]
+
+_write_lock = threading.Lock()
+# Bumped by every local write so a pull that raced it doesn't overwrite it
+_generation = defaultdict(int)
+
+
+@contextmanager
+def connect(path):
+    """Open the mirror database, committing and closing when done"""
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_value(column, value):
+    """Convert a cell to something sqlite3 can store"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if column in KEY_COLUMNS:
+        return str(value)
+    if hasattr(value, "item"):
+        value = value.item()
+    # IDs read from the sheet can be integers wider than SQLite's 64 bits
+    if isinstance(value, int) and not isinstance(value, bool) and abs(value) >= 2 ** 63:
+        return str(value)
+    return value
+
+
+def has_table(path, sheet_name):
+    """Check whether a tab has been mirrored yet"""
+    with connect(path) as conn:
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (sheet_name,)
+        ).fetchone()
+    return row is not None
+
+
+def generation(sheet_name):
+    """Current local write generation of a tab"""
+    with _write_lock:
+        return _generation[sheet_name]
+
+
+def store_tab(path, sheet_name, df, if_generation=None):
+    """
+    Replace a tab's mirrored rows with a DataFrame read from the sheet.
+    Skipped (returns False) if a local write happened since if_generation.
+    """
+    columns = list(df.columns)
+    table = _quote(sheet_name)
+    with _write_lock:
+        if if_generation is not None and _generation[sheet_name] != if_generation:
+            return False
+        with connect(path) as conn:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+            column_defs = ", ".join(
+                f"{_quote(c)} TEXT" if c in KEY_COLUMNS else _quote(c) for c in columns
+            )
+            conn.execute(f"CREATE TABLE {table} ({column_defs or '_empty'})")
+            for index_columns in INDEXES:
+                if all(c in columns for c in index_columns):
+                    index_name = _quote(f"idx_{sheet_name}_{'_'.join(index_columns)}")
+                    conn.execute(f"CREATE INDEX {index_name} ON {table} "
+                                 f"({', '.join(_quote(c) for c in index_columns)})")
+            if columns and not df.empty:
+                placeholders = ", ".join("?" for _ in columns)
+                rows = [
+                    [_sql_value(c, v) for c, v in zip(columns, record)]
+                    for record in df.itertuples(index=False, name=None)
+                ]
+                conn.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows)
+    return True
+
+
+def load_tab(path, sheet_name, where=None, params=(), columns=None):
+    """
+    Read a mirrored tab (optionally filtered by a SQL condition and limited
+    to some columns) as a DataFrame
+    """
+    with connect(path) as conn:
+        selected = "*"
+        if columns:
+            existing = {r[1] for r in conn.execute(f"PRAGMA table_info({_quote(sheet_name)})")}
+            selected = ", ".join(_quote(c) for c in columns if c in existing) or "NULL AS _empty"
+        sql = f"SELECT {selected} FROM {_quote(sheet_name)}"
+        if where:
+            sql += f" WHERE {where}"
+        df = pd.read_sql_query(sql, conn, params=list(params))
+    return df.drop(columns=["_empty"], errors="ignore")
+
+
+def insert_row(path, sheet_name, data):
+    """Mirror a row appended to the sheet"""
+    with _write_lock:
+        _generation[sheet_name] += 1
+        with connect(path) as conn:
+            columns = [r[1] for r in conn.execute(f"PRAGMA table_info({_quote(sheet_name)})")]
+            columns = [c for c in columns if c in data]
+            if not columns:
+                return
+            # A pull may already have brought this row in
+            if "id" in columns:
+                conn.execute(f"DELETE FROM {_quote(sheet_name)} WHERE {_quote('id')} = ?",
+                             [_sql_value("id", data["id"])])
+            conn.execute(
+                f"INSERT INTO {_quote(sheet_name)} ({', '.join(_quote(c) for c in columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                [_sql_value(c, data[c]) for c in columns]
+            )
+
+
+def update_rows(path, sheet_name, key_columns, data):
+    """Mirror fields written to the sheet rows matching key_columns ({column: value})"""
+    with _write_lock:
+        _generation[sheet_name] += 1
+        with connect(path) as conn:
+            columns = {r[1] for r in conn.execute(f"PRAGMA table_info({_quote(sheet_name)})")}
+            fields = [c for c in data if c in columns]
+            if not fields or not all(c in columns for c in key_columns):
+                return
+            conn.execute(
+                f"UPDATE {_quote(sheet_name)} SET {', '.join(f'{_quote(c)} = ?' for c in fields)} "
+                f"WHERE {' AND '.join(f'{_quote(c)} = ?' for c in key_columns)}",
+                [_sql_value(c, data[c]) for c in fields] +
+                [_sql_value(c, v) for c, v in key_columns.items()]
+            )
+
+
+def delete_rows(path, sheet_name, key_column, value):
+    """Mirror rows deleted from the sheet"""
+    with _write_lock:
+        _generation[sheet_name] += 1
+        with connect(path) as conn:
+            columns = {r[1] for r in conn.execute(f"PRAGMA table_info({_quote(sheet_name)})")}
+            if key_column not in columns:
+                return
+            conn.execute(f"DELETE FROM {_quote(sheet_name)} WHERE {_quote(key_column)} = ?",
+                         [_sql_value(key_column, value)])
@@ -114,3 +114,24 @@ def show_error_message(message):
 def show_warning_message(message):
     """Display warning message"""
     st.warning(f"⚠️ {message}")
+
+
+def shown_version(form, record_key, version):
+    """
+    The version (updated_at) of the record a form showed on the previous run,
+    to save against. Forms re-read their record on every run, so by the time
+    Save is clicked the record may have moved on; this remembers the version
+    shown now for the next run.
+    """
+    state_key = f"{form}_version"
+    previous = st.session_state.get(state_key)
+    version = version or ""
+    st.session_state[state_key] = (record_key, version)
+    if previous and previous[0] == record_key:
+        return previous[1]
+    return version
+
+
+def keep_version(form, record_key, version):
+    """Save the next submit of a form against this version (e.g. after a conflict)"""
+    st.session_state[f"{form}_version"] = (record_key, version or "")
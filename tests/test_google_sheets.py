@@ -0,0 +1,217 @@
+import threading
+import gspread
+import pandas as pd
+import pytest
+from gspread.utils import a1_to_rowcol
+
+import bulk_import
+import google_sheets
+
+
+class FakeWorksheet:
+    """A tab kept as a list of rows of text, with the calls google_sheets makes"""
+
+    def __init__(self, spreadsheet, title, sheet_id):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self.rows = []
+        self.col_count = 26
+
+    def row_values(self, row_number):
+        return list(self.rows[row_number - 1]) if row_number <= len(self.rows) else []
+
+    def col_values(self, col):
+        return [row[col - 1] if len(row) >= col else '' for row in self.rows]
+
+    def append_row(self, row, **kwargs):
+        return self.append_rows([row])
+
+    def append_rows(self, rows, **kwargs):
+        first = len(self.rows) + 1
+        self.rows.extend([str(value) for value in row] for row in rows)
+        return {'updates': {'updatedRange': f"{self.title}!A{first}:Z{len(self.rows)}"}}
+
+    def clear(self):
+        self.rows = []
+
+    def update(self, values, **kwargs):
+        self.rows = [[str(value) for value in row] for row in values]
+
+    def update_cell(self, row_number, col, value):
+        self.set_cells(row_number, col, [[value]])
+
+    def batch_update(self, data, **kwargs):
+        for update in data:
+            self.set_cells(*a1_to_rowcol(update['range'].split(':')[0]), update['values'])
+
+    def set_cells(self, row_number, col, values):
+        for offset, cells in enumerate(values):
+            while len(self.rows) < row_number + offset:
+                self.rows.append([])
+            row = self.rows[row_number + offset - 1]
+            row.extend([''] * (col + len(cells) - 1 - len(row)))
+            row[col - 1:col - 1 + len(cells)] = [str(cell) for cell in cells]
+
+
+class FakeSpreadsheet:
+    def __init__(self):
+        self.tabs = {}
+
+    def worksheet(self, title):
+        if title not in self.tabs:
+            raise gspread.WorksheetNotFound(title)
+        return self.tabs[title]
+
+    def worksheets(self):
+        return list(self.tabs.values())
+
+    def add_worksheet(self, title, rows, cols):
+        self.tabs[title] = FakeWorksheet(self, title, len(self.tabs) + 1)
+        return self.tabs[title]
+
+    def values_batch_get(self, ranges, params=None):
+        value_ranges = []
+        for a1_range in ranges:
+            title, _, cells = a1_range.partition('!')
+            rows = self.tabs[title.strip("'").replace("''", "'")].rows
+            if cells:
+                # A single column, e.g. B:B
+                col = a1_to_rowcol(cells.split(':')[0] + '1')[1]
+                rows = [[row[col - 1] if len(row) >= col else ''] for row in rows]
+            value_ranges.append({'range': a1_range, 'values': rows})
+        return {'valueRanges': value_ranges}
+
+    def batch_update(self, body):
+        tabs = {tab.id: tab for tab in self.tabs.values()}
+        for request in body['requests']:
+            span = request['deleteDimension']['range']
+            del tabs[span['sheetId']].rows[span['startIndex']:span['endIndex']]
+
+
+@pytest.fixture
+def sheet(monkeypatch):
+    """google_sheets talking to an in-memory spreadsheet with a few jobs"""
+    spreadsheet = FakeSpreadsheet()
+    monkeypatch.setenv("SPREADSHEET_ID", "test")
+    monkeypatch.setenv("SHEETS_APPEND_FLUSH_SECONDS", "0")
+    monkeypatch.setattr(google_sheets, "get_google_sheets_client",
+                        lambda: type("Client", (), {"open_by_key": lambda self, key: spreadsheet})())
+    google_sheets.reset_handles()
+    google_sheets.invalidate_cache()
+    google_sheets.reset_cost_index()
+    google_sheets.initialize_sheets()
+    jobs = [google_sheets.create_job({'job_number': number, 'job_name': f"J{number}", 'status': 'active'})
+            for number in ('1', '2', '3')]
+    yield spreadsheet, jobs
+    google_sheets.reset_handles()
+    google_sheets.invalidate_cache()
+
+
+def jobs_by_id(spreadsheet):
+    """Each Jobs row (after the header) as a dict, keyed by id"""
+    headers, *rows = spreadsheet.tabs[google_sheets.SHEET_JOBS].rows
+    records = [dict(zip(headers, row)) for row in rows]
+    assert all(record['id'] for record in records), "a write landed on a row with no id"
+    return {record['id']: record for record in records}
+
+
+def delete_in_between(monkeypatch, name, job_id):
+    """
+    Make google_sheets.<name>, called once rows have been located and before
+    they are written, first start delete_job(job_id) on another thread and
+    give it a moment to finish
+    """
+    original = getattr(google_sheets, name)
+    threads = []
+
+    def wrapper(*args, **kwargs):
+        if not threads:
+            threads.append(threading.Thread(target=google_sheets.delete_job, args=(job_id,)))
+            threads[0].start()
+            threads[0].join(timeout=0.5)
+        return original(*args, **kwargs)
+    monkeypatch.setattr(google_sheets, name, wrapper)
+    return threads
+
+
+def test_update_lands_on_its_row_when_a_delete_runs_between_locate_and_write(sheet, monkeypatch):
+    spreadsheet, (first, _, third) = sheet
+    threads = delete_in_between(monkeypatch, "update_row", first['id'])
+
+    google_sheets.update_job(third['id'], {'job_name': 'J3 edited'}, expected_version=third['updated_at'])
+    threads[0].join()
+
+    jobs = jobs_by_id(spreadsheet)
+    assert first['id'] not in jobs
+    assert jobs[third['id']]['job_name'] == 'J3 edited'
+    assert [job['job_name'] for job in jobs.values()] == ['J2', 'J3 edited']
+
+
+def test_import_updates_its_rows_when_a_delete_runs_between_read_and_write(sheet, monkeypatch):
+    spreadsheet, (first, _, third) = sheet
+    threads = delete_in_between(monkeypatch, "changed_cells", first['id'])
+
+    chunk = pd.DataFrame({'job_number': ['3', '4'], 'job_name': ['J3 imported', 'J4']})
+    result = google_sheets.import_jobs([chunk])
+    threads[0].join()
+
+    assert (result['inserted'], result['updated'], result['errors']) == (1, 1, [])
+    jobs = jobs_by_id(spreadsheet)
+    assert first['id'] not in jobs
+    assert [job['job_name'] for job in jobs.values()] == ['J2', 'J3 imported', 'J4']
+
+
+def test_first_batch_save_after_upgrade_builds_job_totals_from_every_cost(sheet):
+    spreadsheet, (first, second, _) = sheet
+    # Costs entered before JobTotals existed, still in the pre-split tab
+    legacy = spreadsheet.add_worksheet(google_sheets.SHEET_WEEKLY_COSTS, 1000, 25)
+    legacy.rows = [['id', 'job_id', 'week_ending', 'labor_actual'],
+                   ['c1', first['id'], '2024-01-06', '1000'],
+                   ['c2', second['id'], '2024-01-06', '500']]
+    google_sheets.reset_handles()
+
+    google_sheets.upsert_weekly_costs([{'job_id': first['id'], 'week_ending': '2024-01-06',
+                                        'labor_actual': 1010}])
+
+    totals = google_sheets.get_all_job_cost_totals()
+    assert totals[first['id']]['labor'] == 1010
+    assert totals[second['id']]['labor'] == 500
+
+
+def test_import_parses_the_file_unlocked_and_rechecks_jobs_deleted_meanwhile(sheet, monkeypatch):
+    spreadsheet, (first, _, _) = sheet
+    collect = bulk_import.collect
+
+    def collect_then_delete(*args):
+        # Row positions aren't held while the file is read, so deletes and updates aren't held up
+        assert not google_sheets.row_positions(google_sheets.SHEET_JOBS)._shared
+        result = collect(*args)
+        google_sheets.delete_job(first['id'])
+        return result
+    monkeypatch.setattr(bulk_import, "collect", collect_then_delete)
+
+    chunk = pd.DataFrame({'job_number': ['1', '2'], 'notes': ['gone', 'kept']})
+    result = google_sheets.import_jobs([chunk])
+
+    assert result == {"inserted": 0, "updated": 1,
+                      "errors": [{"row": 2, "error": "job_name is missing for a new job"}]}
+    jobs = jobs_by_id(spreadsheet)
+    assert [(job['job_name'], job['notes']) for job in jobs.values()] == [('J2', 'kept'), ('J3', '')]
+
+
+def test_cells_are_parsed_once_per_column_like_get_all_records():
+    headers = ['id', 'job_id', 'week_ending', 'labor_actual', 'notes', 'extra']
+    values = [headers,
+              ['20250104120000000001', '20250101000000000007', '2025-01-04', '1,250.50', '42', '1,000'],
+              ['20250104120000000002', '20250101000000000007', '2025-01-11', '', 'see 7', '2.5']]
+
+    df = google_sheets.apply_column_types(
+        'WeeklyCosts_2025', google_sheets.values_to_dataframe('WeeklyCosts_2025', values))
+
+    # IDs keep every digit, amounts are typed whole, untyped columns as get_all_records
+    assert df['id'].tolist() == ['20250104120000000001', '20250104120000000002']
+    assert df['job_id'].astype(str).tolist() == ['20250101000000000007'] * 2
+    assert df['labor_actual'].tolist() == [1250.5, 0.0]
+    assert df['notes'].tolist() == [42, 'see 7']
+    assert df['extra'].tolist() == [1000, 2.5]
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+import ids
+
+
+def freeze(monkeypatch, *times):
+    """Make the ID clock return the given times, then keep the last one"""
+    times = list(times)
+    monkeypatch.setattr(ids, "_clock", lambda: times.pop(0) if len(times) > 1 else times[0])
+    ids._reset()
+
+
+def test_same_timestamp_uses_sequence_and_stays_sorted(monkeypatch):
+    freeze(monkeypatch, datetime(2025, 1, 4, 12, 0, 0, 5))
+    minted = ids.generate_ids(10 ** ids.SEQUENCE_DIGITS + 5)
+    assert minted == sorted(minted)
+    assert len(set(minted)) == len(minted)
+    # Once the sequence runs out the stamp moves a microsecond ahead of the clock
+    assert minted[-1].startswith("20250104120000000006")
+
+
+def test_backwards_clock_never_sorts_before_previous_id(monkeypatch):
+    freeze(monkeypatch, datetime(2025, 1, 4, 12, 0, 1), datetime(2025, 1, 4, 11, 59, 0),
+           datetime(2025, 1, 4, 12, 0, 2))
+    first, behind, later = ids.generate_ids(3)
+    assert first < behind < later
+    assert behind[:20] == first[:20]
+    assert later.startswith("20250104120002000000")
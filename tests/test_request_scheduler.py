@@ -0,0 +1,57 @@
+import gspread
+import pytest
+import requests
+
+import request_scheduler
+
+
+def api_error(status):
+    response = requests.Response()
+    response.status_code = status
+    response._content = b'{"error": {"code": %d, "message": "failed", "status": "x"}}' % status
+    return gspread.exceptions.APIError(response)
+
+
+def failing(*statuses):
+    """A request that fails with the given statuses in turn, then succeeds"""
+    calls = []
+
+    def request():
+        calls.append(len(calls))
+        if len(calls) <= len(statuses):
+            raise api_error(statuses[len(calls) - 1])
+        return "ok"
+    return request, calls
+
+
+@pytest.fixture(autouse=True)
+def no_waiting(monkeypatch):
+    """Skip the backoff sleeps, and give each test a full, large request budget"""
+    monkeypatch.setattr(request_scheduler.time, "sleep", lambda seconds: None)
+    limits = dict(request_scheduler._limits)
+    request_scheduler.configure(reads_per_minute=60000, writes_per_minute=60000)
+    yield
+    request_scheduler._limits.update(limits)
+    request_scheduler.configure()
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_reads_retry_quota_and_server_errors(status):
+    request, calls = failing(status, status)
+    assert request_scheduler.read(request) == "ok"
+    assert len(calls) == 3
+
+
+def test_writes_retry_quota_errors():
+    request, calls = failing(429)
+    assert request_scheduler.write(request) == "ok"
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("status", [500, 502, 503])
+def test_writes_are_sent_once_after_a_server_error(status):
+    # The write may have been applied, so sending it again could duplicate it
+    request, calls = failing(status)
+    with pytest.raises(gspread.exceptions.APIError):
+        request_scheduler.write(request)
+    assert len(calls) == 1
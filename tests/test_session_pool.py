@@ -0,0 +1,86 @@
+import gzip
+import http.server
+import json
+import threading
+
+import pytest
+from google.auth.credentials import AnonymousCredentials
+from requests.adapters import HTTPAdapter
+
+import session_pool
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.dumps({
+            "method": self.command,
+            "user_agent": self.headers.get("User-Agent"),
+            "accept_encoding": self.headers.get("Accept-Encoding"),
+            "port": self.client_address[1],
+            "body": self.rfile.read(length).decode(),
+        }).encode()
+        body = gzip.compress(body)
+        self.send_response(200)
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/"
+    httpd.shutdown()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = session_pool.SessionPool(AnonymousCredentials(), size=2)
+    open_session = pool._open
+
+    def open_local():
+        # The test server speaks plain HTTP
+        session = open_session()
+        session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        return session
+    monkeypatch.setattr(pool, "_open", open_local)
+    yield pool
+    pool.close()
+
+
+def test_concurrent_requests_share_a_bounded_set_of_keep_alive_gzip_sessions(server, pool):
+    replies = []
+
+    def load():
+        for _ in range(5):
+            replies.append(pool.request("GET", server).json())
+    threads = [threading.Thread(target=load) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(replies) == 30
+    assert pool._opened == 2
+    # Connections are kept alive: two sessions, two client ports
+    assert len({reply["port"] for reply in replies}) == 2
+    assert all("(gzip)" in reply["user_agent"] for reply in replies)
+    assert all(reply["accept_encoding"] == "gzip" for reply in replies)
+
+
+def test_verb_methods_used_by_gspread_5_forward_to_request(server, pool):
+    for verb in ("get", "post", "put", "patch", "delete"):
+        reply = getattr(pool, verb)(server, json={"verb": verb}).json()
+        assert reply["method"] == verb.upper()
+        if verb != "get":
+            assert json.loads(reply["body"]) == {"verb": verb}